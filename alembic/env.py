@@ -8,6 +8,7 @@ from alembic import context
 from app.config import settings
 from app.database import Base
 from app.models import *  # noqa: Import all models for autogenerate
+from app.services.rule_cache import rule_set_cache
 
 config = context.config
 
@@ -44,15 +45,23 @@ def run_migrations_online() -> None:
         poolclass=pool.NullPool,
     )
 
+    applied = []
+
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            on_version_apply=lambda **kw: applied.append(kw["step"]),
         )
 
         with context.begin_transaction():
             context.run_migrations()
 
+    # System categories and rules are only written by migrations; make
+    # running processes drop their cached rule sets once these commit
+    if applied:
+        rule_set_cache.bump_system_version()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
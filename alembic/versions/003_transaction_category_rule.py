@@ -0,0 +1,31 @@
+"""Track rule that categorized each transaction
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-02 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'transactions',
+        sa.Column('category_rule_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('categorization_rules.id', ondelete='SET NULL'), nullable=True),
+    )
+    op.create_index('ix_transactions_category_rule', 'transactions', ['category_rule_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_category_rule', table_name='transactions')
+    op.drop_column('transactions', 'category_rule_id')
@@ -0,0 +1,78 @@
+"""Add transaction fingerprint for import deduplication
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-01-05 00:00:00.000000
+
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Sequence, Union
+import hashlib
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+# Frozen copies of app.services.ingestion.fingerprint_key / transaction_fingerprint
+def _fingerprint_key(tx_date, amount, tx_type, description):
+    return (
+        tx_date.isoformat(),
+        str(Decimal(amount).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+        tx_type,
+        " ".join((description or "").lower().split()),
+    )
+
+
+def _fingerprint(account_id, key, ordinal) -> uuid.UUID:
+    raw = "|".join([str(account_id), *key, str(ordinal)])
+    return uuid.UUID(bytes=hashlib.sha256(raw.encode("utf-8")).digest()[:16])
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('fingerprint', postgresql.UUID(as_uuid=True), nullable=True))
+
+    # Backfill imported rows. Existing duplicates get increasing ordinals,
+    # so they stay unique; a re-import of either copy is then skipped.
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT id, account_id, date, COALESCE(original_amount, amount), type, "
+        "COALESCE(original_description, description) "
+        "FROM transactions WHERE upload_id IS NOT NULL "
+        "ORDER BY account_id, date, created_at, id"
+    ).execution_options(stream_results=True, yield_per=BATCH_SIZE))
+
+    update = sa.text("UPDATE transactions SET fingerprint = :fingerprint WHERE id = :id")
+    day = None
+    occurrences = {}
+    batch = []
+    for tx_id, account_id, tx_date, amount, tx_type, description in rows:
+        if (account_id, tx_date) != day:
+            day = (account_id, tx_date)
+            occurrences = {}
+        key = _fingerprint_key(tx_date, amount, tx_type, description)
+        ordinal = occurrences.get(key, 0)
+        occurrences[key] = ordinal + 1
+
+        batch.append({'id': tx_id, 'fingerprint': _fingerprint(account_id, key, ordinal)})
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(update, batch)
+            batch = []
+    if batch:
+        conn.execute(update, batch)
+
+    op.create_index('ix_transactions_fingerprint', 'transactions', ['fingerprint'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_fingerprint', table_name='transactions')
+    op.drop_column('transactions', 'fingerprint')
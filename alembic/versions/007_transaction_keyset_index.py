@@ -0,0 +1,33 @@
+"""Add transaction keyset pagination index
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-01-06 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches the list order (date, created_at, id) within an account;
+    # supersedes (account_id, date), which is a prefix of it
+    op.create_index(
+        'ix_transactions_account_keyset',
+        'transactions',
+        ['account_id', 'date', 'created_at', 'id'],
+    )
+    op.drop_index('ix_transactions_account_date', table_name='transactions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_transactions_account_date', 'transactions', ['account_id', 'date'])
+    op.drop_index('ix_transactions_account_keyset', table_name='transactions')
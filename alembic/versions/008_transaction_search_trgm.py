@@ -0,0 +1,41 @@
+"""Add trigram search indexes on transactions
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-01-07 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_transactions_description_trgm',
+        'transactions',
+        ['description'],
+        postgresql_using='gin',
+        postgresql_ops={'description': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_transactions_counterparty_trgm',
+        'transactions',
+        ['counterparty'],
+        postgresql_using='gin',
+        postgresql_ops={'counterparty': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_counterparty_trgm', table_name='transactions')
+    op.drop_index('ix_transactions_description_trgm', table_name='transactions')
+    # The extension is left installed; other objects may depend on it
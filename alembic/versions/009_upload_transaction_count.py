@@ -0,0 +1,27 @@
+"""Add upload transaction count
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-01-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL until counted; existing uploads are filled in by
+    # backfill_upload_counts_task rather than in this migration
+    op.add_column('uploads', sa.Column('transaction_count', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('uploads', 'transaction_count')
@@ -0,0 +1,146 @@
+"""Add daily aggregates rollup
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-01-09 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Adds signed per-(account, date, category, type) deltas to the rollup.
+# Takes a shared per-account advisory lock first, so an account's
+# backfill (exclusive lock, RollupService.backfill_account) never
+# overlaps with writers of that account.
+DAILY_AGGREGATES_ADD = """
+CREATE FUNCTION daily_aggregates_add(
+    p_account_ids uuid[],
+    p_category_ids uuid[],
+    p_dates date[],
+    p_types varchar[],
+    p_amounts numeric[],
+    p_counts integer[]
+) RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    IF p_account_ids IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock_shared(hashtext('daily_aggregates'), hashtext(ids.account_id::text))
+    FROM (SELECT DISTINCT unnest(p_account_ids) AS account_id ORDER BY 1) ids;
+
+    INSERT INTO daily_aggregates AS d (account_id, date, category_id, type, amount, count)
+    SELECT c.account_id, c.date, c.category_id, c.type, sum(c.amount), sum(c.count)
+    FROM unnest(p_account_ids, p_dates, p_category_ids, p_types, p_amounts, p_counts)
+        AS c(account_id, date, category_id, type, amount, count)
+    -- Accounts deleted in this transaction (cascades) have nothing to keep
+    JOIN accounts a ON a.id = c.account_id
+    GROUP BY c.account_id, c.date, c.category_id, c.type
+    ORDER BY c.account_id, c.date, c.category_id, c.type
+    ON CONFLICT ON CONSTRAINT uq_daily_aggregates_key DO UPDATE
+    SET amount = d.amount + EXCLUDED.amount,
+        count = d.count + EXCLUDED.count;
+
+    DELETE FROM daily_aggregates d
+    USING (SELECT DISTINCT * FROM unnest(p_account_ids, p_dates) AS k(account_id, date)) k
+    WHERE d.account_id = k.account_id AND d.date = k.date AND d.count = 0;
+END;
+$$
+"""
+
+# Statement-level, so a multi-row INSERT or set-based UPDATE (ingestion,
+# recategorization) costs one rollup upsert rather than one per row
+DAILY_AGGREGATES_SYNC = """
+CREATE FUNCTION daily_aggregates_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM daily_aggregates_add(
+            array_agg(account_id), array_agg(category_id), array_agg(date),
+            array_agg(type), array_agg(amount), array_agg(1)
+        )
+        FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM daily_aggregates_add(
+            array_agg(account_id), array_agg(category_id), array_agg(date),
+            array_agg(type), array_agg(-amount), array_agg(-1)
+        )
+        FROM old_rows;
+    ELSE
+        PERFORM daily_aggregates_add(
+            array_agg(c.account_id), array_agg(c.category_id), array_agg(c.date),
+            array_agg(c.type), array_agg(c.amount), array_agg(c.count)
+        )
+        FROM (
+            SELECT n.account_id, n.category_id, n.date, n.type, n.amount, 1 AS count
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE (n.account_id, n.category_id, n.date, n.type, n.amount)
+                IS DISTINCT FROM (o.account_id, o.category_id, o.date, o.type, o.amount)
+            UNION ALL
+            SELECT o.account_id, o.category_id, o.date, o.type, -o.amount, -1 AS count
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE (n.account_id, n.category_id, n.date, n.type, n.amount)
+                IS DISTINCT FROM (o.account_id, o.category_id, o.date, o.type, o.amount)
+        ) c;
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+TRIGGERS = {
+    'transactions_daily_aggregates_insert': ('INSERT', 'NEW TABLE AS new_rows'),
+    'transactions_daily_aggregates_update': ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    'transactions_daily_aggregates_delete': ('DELETE', 'OLD TABLE AS old_rows'),
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_aggregates',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('accounts.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('type', sa.String(10), nullable=False),
+        sa.Column('amount', sa.Numeric(18, 2), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            'account_id', 'date', 'category_id', 'type',
+            name='uq_daily_aggregates_key',
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    # Existing accounts are served from raw rows until backfilled
+    op.add_column(
+        'accounts',
+        sa.Column('rollup_ready', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+    op.execute(DAILY_AGGREGATES_ADD)
+    op.execute(DAILY_AGGREGATES_SYNC)
+    for name, (event, transition_tables) in TRIGGERS.items():
+        op.execute(
+            f'CREATE TRIGGER {name} AFTER {event} ON transactions '
+            f'REFERENCING {transition_tables} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION daily_aggregates_sync()'
+        )
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f'DROP TRIGGER {name} ON transactions')
+    op.execute('DROP FUNCTION daily_aggregates_sync()')
+    op.execute('DROP FUNCTION daily_aggregates_add(uuid[], uuid[], date[], varchar[], numeric[], integer[])')
+    op.drop_column('accounts', 'rollup_ready')
+    op.drop_table('daily_aggregates')
@@ -0,0 +1,206 @@
+"""Partition transactions by month
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-01-10 00:00:00.000000
+
+"""
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months of partitions created past the current one by the migration
+# (afterwards ensure_transaction_partitions_task keeps them ahead)
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    'id', 'account_id', 'upload_id', 'category_id', 'category_rule_id',
+    'amount', 'type', 'date', 'description', 'counterparty',
+    'original_amount', 'original_description', 'original_counterparty',
+    'fingerprint', 'is_edited', 'created_at',
+)
+
+# Creates the partition holding one month, moving that month's rows out
+# of transactions_default first. The partition is built detached and then
+# attached, so the parent is never locked exclusively; the CHECK
+# constraint lets ATTACH skip scanning the new partition. Statement
+# triggers of the parent (daily_aggregates) do not fire for the move.
+ENSURE_TRANSACTION_PARTITION = """
+CREATE FUNCTION ensure_transaction_partition(p_month date) RETURNS boolean
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_from date := date_trunc('month', p_month)::date;
+    v_to date := (date_trunc('month', p_month) + interval '1 month')::date;
+    v_name text := 'transactions_' || to_char(p_month, '"y"YYYY"m"MM');
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext('transactions_partitions'));
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE transactions INCLUDING DEFAULTS, '
+        'CONSTRAINT %I CHECK (date >= %L AND date < %L))',
+        v_name, v_name || '_bounds', v_from, v_to
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM transactions_default WHERE date >= %L AND date < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        v_from, v_to, v_name
+    );
+    EXECUTE format(
+        'ALTER TABLE transactions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_from, v_to
+    );
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_name, v_name || '_bounds');
+    RETURN true;
+END;
+$$
+"""
+
+# Same triggers as in 010; they are dropped along with the old table
+TRIGGERS = {
+    'transactions_daily_aggregates_insert': ('INSERT', 'NEW TABLE AS new_rows'),
+    'transactions_daily_aggregates_update': ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    'transactions_daily_aggregates_delete': ('DELETE', 'OLD TABLE AS old_rows'),
+}
+
+
+def _columns() -> List[sa.Column]:
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('accounts.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('upload_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('uploads.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('categories.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('category_rule_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('categorization_rules.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('amount', sa.Numeric(15, 2), nullable=False),
+        sa.Column('type', sa.String(10), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('counterparty', sa.String(255), nullable=True),
+        sa.Column('original_amount', sa.Numeric(15, 2), nullable=True),
+        sa.Column('original_description', sa.Text(), nullable=True),
+        sa.Column('original_counterparty', sa.String(255), nullable=True),
+        sa.Column('fingerprint', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('is_edited', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    ]
+
+
+def _copy_rows(source: str) -> None:
+    columns = ', '.join(COLUMNS)
+    op.execute(f'INSERT INTO transactions ({columns}) SELECT {columns} FROM {source}')
+
+
+def _create_indexes(primary_key: List[str], fingerprint: List[str]) -> None:
+    # Built after the copy, which is much faster than maintaining them
+    op.create_primary_key('transactions_pkey', 'transactions', primary_key)
+    op.create_index(
+        'ix_transactions_account_keyset',
+        'transactions',
+        ['account_id', 'date', 'created_at', 'id'],
+    )
+    op.create_index('ix_transactions_category', 'transactions', ['category_id'])
+    op.create_index('ix_transactions_upload', 'transactions', ['upload_id'])
+    op.create_index('ix_transactions_category_rule', 'transactions', ['category_rule_id'])
+    op.create_index('ix_transactions_fingerprint', 'transactions', fingerprint, unique=True)
+    op.create_index(
+        'ix_transactions_description_trgm',
+        'transactions',
+        ['description'],
+        postgresql_using='gin',
+        postgresql_ops={'description': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_transactions_counterparty_trgm',
+        'transactions',
+        ['counterparty'],
+        postgresql_using='gin',
+        postgresql_ops={'counterparty': 'gin_trgm_ops'},
+    )
+
+
+def _create_triggers() -> None:
+    for name, (event, transition_tables) in TRIGGERS.items():
+        op.execute(
+            f'CREATE TRIGGER {name} AFTER {event} ON transactions '
+            f'REFERENCING {transition_tables} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION daily_aggregates_sync()'
+        )
+
+
+def upgrade() -> None:
+    # Rebuilds the table: writes to transactions are blocked until the
+    # migration commits, so run it in a maintenance window on large data.
+    # daily_aggregates stays valid since the rows do not change.
+    op.execute('LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE')
+    op.rename_table('transactions', 'transactions_unpartitioned')
+    op.execute('ALTER INDEX transactions_pkey RENAME TO transactions_unpartitioned_pkey')
+
+    # Unique constraints must include the partition key, hence (id, date)
+    # and (fingerprint, date); the date is part of the fingerprint, so
+    # the latter is as strict as before.
+    op.create_table(
+        'transactions',
+        *_columns(),
+        postgresql_partition_by='RANGE (date)',
+    )
+    op.execute('CREATE TABLE transactions_default PARTITION OF transactions DEFAULT')
+    op.execute(ENSURE_TRANSACTION_PARTITION)
+
+    # A partition for every month with data, and the next few
+    op.execute(f"""
+        SELECT ensure_transaction_partition(month::date)
+        FROM (
+            SELECT DISTINCT date_trunc('month', date) AS month FROM transactions_unpartitioned
+            UNION
+            SELECT generate_series(
+                date_trunc('month', current_date),
+                date_trunc('month', current_date) + interval '{MONTHS_AHEAD} months',
+                interval '1 month'
+            )
+        ) months
+        ORDER BY month
+    """)
+
+    _copy_rows('transactions_unpartitioned')
+    op.drop_table('transactions_unpartitioned')
+
+    _create_indexes(['id', 'date'], ['fingerprint', 'date'])
+    _create_triggers()
+
+
+def downgrade() -> None:
+    op.execute('LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE')
+    op.rename_table('transactions', 'transactions_partitioned')
+    op.execute('ALTER INDEX transactions_pkey RENAME TO transactions_partitioned_pkey')
+    for index in (
+        'ix_transactions_account_keyset',
+        'ix_transactions_category',
+        'ix_transactions_upload',
+        'ix_transactions_category_rule',
+        'ix_transactions_fingerprint',
+        'ix_transactions_description_trgm',
+        'ix_transactions_counterparty_trgm',
+    ):
+        op.drop_index(index, table_name='transactions_partitioned')
+
+    op.create_table('transactions', *_columns())
+    _copy_rows('transactions_partitioned')
+    op.drop_table('transactions_partitioned')
+    op.execute('DROP FUNCTION ensure_transaction_partition(date)')
+
+    _create_indexes(['id'], ['fingerprint'])
+    _create_triggers()
@@ -0,0 +1,41 @@
+"""One unfinished recategorization job per user
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-01-11 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicates left by concurrent requests: keep the newest per user
+    op.execute("""
+        UPDATE recategorization_jobs SET status = 'error', error_message = 'Superseded by a newer job'
+        WHERE status IN ('pending', 'running')
+          AND id NOT IN (
+              SELECT DISTINCT ON (user_id) id FROM recategorization_jobs
+              WHERE status IN ('pending', 'running')
+              ORDER BY user_id, created_at DESC
+          )
+    """)
+    op.create_index(
+        'ix_recategorization_jobs_user_active',
+        'recategorization_jobs',
+        ['user_id'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recategorization_jobs_user_active', table_name='recategorization_jobs')
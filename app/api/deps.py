@@ -1,16 +1,25 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator, NamedTuple
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
 from app.models import User
-from app.utils.security import verify_token
+from app.services.user_cache import user_cache
+from app.utils.security import PasswordHasherBusyError, verify_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+class Principal(NamedTuple):
+    """Authenticated caller as carried by the access token."""
+    id: UUID
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
@@ -19,24 +28,53 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-) -> User:
-    credentials_exception = HTTPException(
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def password_hasher_busy_exception(e: PasswordHasherBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Caller identity from the access token alone, without a database
+    round-trip. Use it for endpoints that only need the user id.
+    Async so that async routes do not hop to the threadpool for it.
+    """
     payload = verify_token(token, token_type="access")
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    return Principal(id=payload.sub)
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
+) -> User:
+    user = user_cache.get(db, principal.id)
+    if user is not None:
+        return user
 
-    user = db.query(User).filter(User.id == payload.sub).first()
+    user = db.query(User).filter(User.id == principal.id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
+    user_cache.set(user)
     return user
 
 
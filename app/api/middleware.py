@@ -0,0 +1,61 @@
+from typing import Dict
+
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def _too_large_detail(limit: int) -> str:
+    return f"Request body too large. Maximum size is {limit // (1024 * 1024)}MB"
+
+
+class BodySizeLimitMiddleware:
+    """
+    Caps the request body of selected POST routes while it is received.
+
+    Starlette spools a multipart body to disk before the route runs, so
+    a limit checked by the route only fires once the whole body has been
+    transferred. Here a Content-Length over the cap is refused before any
+    of the body is read, and a body without one (chunked) is cut off with
+    a 413 as soon as it passes the cap.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        # Path -> maximum body size in bytes
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limit = self.limits.get(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(
+                {"detail": _too_large_detail(limit)},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the route's body parsing, which passes
+                    # HTTPException through unchanged
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=_too_large_detail(limit),
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -2,35 +2,37 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from app.api.deps import get_db, get_current_user
-from app.models import User, Account, Bank
+from app.api.deps import get_db, get_async_db, get_current_principal, Principal
+from app.models import Account, Bank
 from app.schemas import AccountCreate, AccountUpdate, AccountResponse
+from app.services.analytics_cache import analytics_cache
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[AccountResponse])
-def get_accounts(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_accounts(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all accounts for current user."""
-    accounts = (
-        db.query(Account)
+    result = await db.execute(
+        select(Account)
         .options(joinedload(Account.bank))
-        .filter(Account.user_id == current_user.id)
+        .where(Account.user_id == current_user.id)
         .order_by(Account.created_at.desc())
-        .all()
     )
-    return accounts
+    return result.scalars().all()
 
 
 @router.post("", response_model=AccountResponse, status_code=status.HTTP_201_CREATED)
 def create_account(
     account_data: AccountCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Create a new account."""
@@ -51,6 +53,7 @@ def create_account(
     )
     db.add(account)
     db.commit()
+    analytics_cache.bump_user_version(current_user.id)
     db.refresh(account)
 
     # Load bank relationship
@@ -59,18 +62,18 @@ def create_account(
 
 
 @router.get("/{account_id}", response_model=AccountResponse)
-def get_account(
+async def get_account(
     account_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get account by ID."""
-    account = (
-        db.query(Account)
+    result = await db.execute(
+        select(Account)
         .options(joinedload(Account.bank))
-        .filter(Account.id == account_id, Account.user_id == current_user.id)
-        .first()
+        .where(Account.id == account_id, Account.user_id == current_user.id)
     )
+    account = result.scalars().first()
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,7 +86,7 @@ def get_account(
 def update_account(
     account_id: UUID,
     account_data: AccountUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Update account."""
@@ -106,6 +109,7 @@ def update_account(
         account.account_number = account_data.account_number
 
     db.commit()
+    analytics_cache.bump_user_version(current_user.id)
     db.refresh(account, ["bank"])
     return account
 
@@ -113,7 +117,7 @@ def update_account(
 @router.delete("/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_account(
     account_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Delete account and all related data."""
@@ -130,3 +134,4 @@ def delete_account(
 
     db.delete(account)
     db.commit()
+    analytics_cache.bump_user_version(current_user.id)
@@ -1,19 +1,21 @@
 from datetime import date, timedelta
-from typing import List, Literal, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from pydantic import BaseModel
 
-from app.api.deps import get_db, get_current_user
-from app.models import User
+from app.api.deps import get_current_principal, Principal
+from app.database import AsyncSessionLocal
 from app.schemas.analytics import (
     SummaryResponse,
     AnalyticsByCategoryResponse,
     AnalyticsByPeriodResponse,
     AnalyticsByAccountResponse,
+    DashboardResponse,
 )
 from app.services import AnalyticsService
+from app.services.analytics_cache import Compute, analytics_cache
 
 router = APIRouter()
 
@@ -28,10 +30,21 @@ def get_default_date_range() -> tuple[date, date]:
     return date_from, date_to
 
 
+def _compute(build: Callable[[AnalyticsService], BaseModel]) -> Compute:
+    """
+    Response computation for the analytics cache. Opens its own session,
+    since a stale entry is refreshed after the request has finished.
+    """
+    async def compute() -> Dict[str, Any]:
+        async with AsyncSessionLocal() as session:
+            response = await session.run_sync(lambda s: build(AnalyticsService(s)))
+        return response.model_dump(mode="json")
+    return compute
+
+
 @router.get("/summary", response_model=SummaryResponse)
-def get_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_summary(
+    current_user: Principal = Depends(get_current_principal),
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     account_ids: Optional[List[UUID]] = Query(None),
@@ -40,19 +53,23 @@ def get_summary(
     if not date_from or not date_to:
         date_from, date_to = get_default_date_range()
 
-    service = AnalyticsService(db)
-    return service.get_summary(
-        user_id=current_user.id,
-        date_from=date_from,
-        date_to=date_to,
-        account_ids=account_ids,
+    return await analytics_cache.get_or_compute(
+        current_user.id,
+        "summary",
+        {"date_from": date_from, "date_to": date_to, "account_ids": account_ids},
+        date_to,
+        _compute(lambda service: service.get_summary(
+            user_id=current_user.id,
+            date_from=date_from,
+            date_to=date_to,
+            account_ids=account_ids,
+        )),
     )
 
 
 @router.get("/by-category", response_model=AnalyticsByCategoryResponse)
-def get_by_category(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_by_category(
+    current_user: Principal = Depends(get_current_principal),
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     transaction_type: Literal["income", "expense"] = "expense",
@@ -62,30 +79,42 @@ def get_by_category(
     if not date_from or not date_to:
         date_from, date_to = get_default_date_range()
 
-    service = AnalyticsService(db)
-    categories = service.get_by_category(
-        user_id=current_user.id,
-        date_from=date_from,
-        date_to=date_to,
-        transaction_type=transaction_type,
-        account_ids=account_ids,
-    )
-
-    total = sum(c.total_amount for c in categories)
-
-    return AnalyticsByCategoryResponse(
-        date_from=date_from,
-        date_to=date_to,
-        type=transaction_type,
-        total=total,
-        categories=categories,
+    def build(service: AnalyticsService) -> AnalyticsByCategoryResponse:
+        categories = service.get_by_category(
+            user_id=current_user.id,
+            date_from=date_from,
+            date_to=date_to,
+            transaction_type=transaction_type,
+            account_ids=account_ids,
+        )
+
+        total = sum(c.total_amount for c in categories)
+
+        return AnalyticsByCategoryResponse(
+            date_from=date_from,
+            date_to=date_to,
+            type=transaction_type,
+            total=total,
+            categories=categories,
+        )
+
+    return await analytics_cache.get_or_compute(
+        current_user.id,
+        "by-category",
+        {
+            "date_from": date_from,
+            "date_to": date_to,
+            "transaction_type": transaction_type,
+            "account_ids": account_ids,
+        },
+        date_to,
+        _compute(build),
     )
 
 
 @router.get("/by-period", response_model=AnalyticsByPeriodResponse)
-def get_by_period(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_by_period(
+    current_user: Principal = Depends(get_current_principal),
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     grouping: Literal["day", "week", "month"] = "month",
@@ -98,27 +127,39 @@ def get_by_period(
         date_from = (today - timedelta(days=180)).replace(day=1)
         date_to = today
 
-    service = AnalyticsService(db)
-    periods = service.get_by_period(
-        user_id=current_user.id,
-        date_from=date_from,
-        date_to=date_to,
-        grouping=grouping,
-        account_ids=account_ids,
-    )
-
-    return AnalyticsByPeriodResponse(
-        date_from=date_from,
-        date_to=date_to,
-        grouping=grouping,
-        periods=periods,
+    def build(service: AnalyticsService) -> AnalyticsByPeriodResponse:
+        periods = service.get_by_period(
+            user_id=current_user.id,
+            date_from=date_from,
+            date_to=date_to,
+            grouping=grouping,
+            account_ids=account_ids,
+        )
+
+        return AnalyticsByPeriodResponse(
+            date_from=date_from,
+            date_to=date_to,
+            grouping=grouping,
+            periods=periods,
+        )
+
+    return await analytics_cache.get_or_compute(
+        current_user.id,
+        "by-period",
+        {
+            "date_from": date_from,
+            "date_to": date_to,
+            "grouping": grouping,
+            "account_ids": account_ids,
+        },
+        date_to,
+        _compute(build),
     )
 
 
 @router.get("/by-account", response_model=AnalyticsByAccountResponse)
-def get_by_account(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_by_account(
+    current_user: Principal = Depends(get_current_principal),
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
 ):
@@ -126,15 +167,58 @@ def get_by_account(
     if not date_from or not date_to:
         date_from, date_to = get_default_date_range()
 
-    service = AnalyticsService(db)
-    accounts = service.get_by_account(
-        user_id=current_user.id,
-        date_from=date_from,
-        date_to=date_to,
+    def build(service: AnalyticsService) -> AnalyticsByAccountResponse:
+        accounts = service.get_by_account(
+            user_id=current_user.id,
+            date_from=date_from,
+            date_to=date_to,
+        )
+
+        return AnalyticsByAccountResponse(
+            date_from=date_from,
+            date_to=date_to,
+            accounts=accounts,
+        )
+
+    return await analytics_cache.get_or_compute(
+        current_user.id,
+        "by-account",
+        {"date_from": date_from, "date_to": date_to},
+        date_to,
+        _compute(build),
     )
 
-    return AnalyticsByAccountResponse(
-        date_from=date_from,
-        date_to=date_to,
-        accounts=accounts,
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    current_user: Principal = Depends(get_current_principal),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    grouping: Literal["day", "week", "month"] = "month",
+    account_ids: Optional[List[UUID]] = Query(None),
+):
+    """
+    Everything the dashboard shows (summary, income and expense by
+    category, by period, by account) for one period in a single query.
+    """
+    if not date_from or not date_to:
+        date_from, date_to = get_default_date_range()
+
+    return await analytics_cache.get_or_compute(
+        current_user.id,
+        "dashboard",
+        {
+            "date_from": date_from,
+            "date_to": date_to,
+            "grouping": grouping,
+            "account_ids": account_ids,
+        },
+        date_to,
+        _compute(lambda service: service.get_dashboard(
+            user_id=current_user.id,
+            date_from=date_from,
+            date_to=date_to,
+            grouping=grouping,
+            account_ids=account_ids,
+        )),
     )
@@ -2,20 +2,23 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_db, password_hasher_busy_exception
 from app.schemas import UserCreate, UserResponse, Token
 from app.services import AuthService
+from app.utils.security import PasswordHasherBusyError
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
     service = AuthService(db)
     try:
-        user = service.register(user_data)
+        user = await service.register(user_data)
         return user
+    except PasswordHasherBusyError as e:
+        raise password_hasher_busy_exception(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,13 +27,16 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
     """Login and get access/refresh tokens."""
     service = AuthService(db)
-    user = service.authenticate(form_data.username, form_data.password)
+    try:
+        user = await service.authenticate(form_data.username, form_data.password)
+    except PasswordHasherBusyError as e:
+        raise password_hasher_busy_exception(e)
 
     if not user:
         raise HTTPException(
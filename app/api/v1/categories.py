@@ -4,16 +4,18 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
-from app.models import User, Category
+from app.api.deps import get_db, get_current_principal, Principal
+from app.models import Category
 from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse
+from app.services.analytics_cache import analytics_cache
+from app.services.rule_cache import rule_set_cache
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[CategoryResponse])
 def get_categories(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Get all categories (system + user's custom)."""
@@ -32,7 +34,7 @@ def get_categories(
 @router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 def create_category(
     category_data: CategoryCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Create a custom category."""
@@ -63,7 +65,7 @@ def create_category(
 def update_category(
     category_id: UUID,
     category_data: CategoryUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Update a custom category."""
@@ -85,6 +87,8 @@ def update_category(
         category.type = category_data.type
 
     db.commit()
+    # Category names appear in analytics
+    analytics_cache.bump_user_version(current_user.id)
     db.refresh(category)
     return category
 
@@ -92,7 +96,7 @@ def update_category(
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_category(
     category_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Delete a custom category."""
@@ -110,3 +114,7 @@ def delete_category(
 
     db.delete(category)
     db.commit()
+
+    # Rules pointing at the category were deleted with it
+    rule_set_cache.bump_user_version(current_user.id)
+    analytics_cache.bump_user_version(current_user.id)
@@ -1,20 +1,23 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
-from app.api.deps import get_db, get_current_user
-from app.models import User, CategorizationRule
-from app.schemas import RuleCreate, RuleResponse
+from app.api.deps import get_db, get_current_principal, Principal
+from app.models import CategorizationRule, RecategorizationJob
+from app.schemas import RuleCreate, RuleResponse, RecategorizationJobResponse
 from app.services import CategorizationService
+from app.tasks.recategorize import recategorize_task
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[RuleResponse])
 def get_rules(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Get all categorization rules (user's + system)."""
@@ -28,6 +31,8 @@ def get_rules(
         .order_by(
             CategorizationRule.user_id.desc().nullslast(),
             CategorizationRule.priority.desc(),
+            CategorizationRule.created_at,
+            CategorizationRule.id,
         )
         .all()
     )
@@ -37,7 +42,7 @@ def get_rules(
 @router.post("", response_model=RuleResponse, status_code=status.HTTP_201_CREATED)
 def create_rule(
     rule_data: RuleCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Create a categorization rule."""
@@ -64,7 +69,7 @@ def create_rule(
 @router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_rule(
     rule_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Delete a categorization rule (user rules only)."""
@@ -80,7 +85,7 @@ def delete_rule(
 
 @router.post("/recategorize", status_code=status.HTTP_200_OK)
 def recategorize_transactions(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Recategorize all non-edited transactions based on current rules."""
@@ -91,3 +96,73 @@ def recategorize_transactions(
         "message": f"Recategorized {updated_count} transactions",
         "updated_count": updated_count,
     }
+
+
+def _job_response(job: RecategorizationJob) -> RecategorizationJobResponse:
+    response = RecategorizationJobResponse.model_validate(job)
+    if job.started_at and job.processed:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            response.rows_per_sec = round(job.processed / elapsed, 1)
+    return response
+
+
+def _unfinished_job(db: Session, user_id: UUID) -> Optional[RecategorizationJob]:
+    return db.query(RecategorizationJob).filter(
+        RecategorizationJob.user_id == user_id,
+        RecategorizationJob.status.in_(["pending", "running"]),
+    ).first()
+
+
+@router.post(
+    "/recategorize/jobs",
+    response_model=RecategorizationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def start_recategorization_job(
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """Start recategorizing all non-edited transactions in the background."""
+    # Reuse an unfinished job instead of queueing a second one
+    job = _unfinished_job(db, current_user.id)
+    if job:
+        return _job_response(job)
+
+    job = RecategorizationJob(user_id=current_user.id, status="pending")
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request created one first (unique partial index)
+        db.rollback()
+        job = _unfinished_job(db, current_user.id)
+        if job:
+            return _job_response(job)
+        raise
+    db.refresh(job)
+
+    recategorize_task.delay(str(job.id))
+
+    return _job_response(job)
+
+
+@router.get("/recategorize/jobs/{job_id}", response_model=RecategorizationJobResponse)
+def get_recategorization_job(
+    job_id: UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """Get recategorization job progress."""
+    job = db.query(RecategorizationJob).filter(
+        RecategorizationJob.id == job_id,
+        RecategorizationJob.user_id == current_user.id,
+    ).first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    return _job_response(job)
@@ -3,24 +3,31 @@ from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload
 
-from app.api.deps import get_db, get_current_user
-from app.models import User, Transaction, Account, Category
+from app.api.deps import get_db, get_async_db, get_current_principal, Principal
+from app.models import Transaction, Account, Category
 from app.schemas import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
 )
+from app.services import SearchService, UploadService
+from app.services.analytics_cache import analytics_cache
+from app.services.search import SearchMode, search_clause
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[TransactionResponse])
-def get_transactions(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_transactions(
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
     account_id: Optional[UUID] = None,
     category_id: Optional[UUID] = None,
     transaction_type: Optional[str] = None,
@@ -29,55 +36,117 @@ def get_transactions(
     min_amount: Optional[Decimal] = None,
     max_amount: Optional[Decimal] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     page: int = Query(1, ge=1),
     size: int = Query(50, ge=1, le=100),
 ):
-    """Get transactions with filters."""
-    query = (
-        db.query(Transaction)
-        .join(Account)
-        .options(joinedload(Transaction.category))
-        .filter(Account.user_id == current_user.id)
-    )
+    """
+    Get transactions with filters, newest first.
 
-    if account_id:
-        query = query.filter(Transaction.account_id == account_id)
+    Pass the X-Next-Cursor response header back as `cursor` to get the
+    next page; `page` is still accepted but deep pages get slower.
+    """
+    filters = []
     if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+        filters.append(Transaction.category_id == category_id)
     if transaction_type:
-        query = query.filter(Transaction.type == transaction_type)
+        filters.append(Transaction.type == transaction_type)
     if date_from:
-        query = query.filter(Transaction.date >= date_from)
+        filters.append(Transaction.date >= date_from)
     if date_to:
-        query = query.filter(Transaction.date <= date_to)
+        filters.append(Transaction.date <= date_to)
     if min_amount:
-        query = query.filter(Transaction.amount >= min_amount)
+        filters.append(Transaction.amount >= min_amount)
     if max_amount:
-        query = query.filter(Transaction.amount <= max_amount)
+        filters.append(Transaction.amount <= max_amount)
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Transaction.description.ilike(search_filter)) |
-            (Transaction.counterparty.ilike(search_filter))
+        filters.append(search_clause(search))
+
+    if cursor:
+        if page > 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either cursor or page, not both",
+            )
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        filters.append(
+            tuple_(Transaction.date, Transaction.created_at, Transaction.id) < tuple_(*position)
         )
 
     # Pagination
     offset = (page - 1) * size
-    transactions = (
+
+    # Each account is read in index order (ix_transactions_account_keyset)
+    # up to the rows this page needs, then the per-account heads are
+    # merged, so the cost does not grow with the user's history
+    per_account = (
+        select(Transaction)
+        .where(Transaction.account_id == Account.id, *filters)
+        .order_by(Transaction.date.desc(), Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(offset + size)
+        .lateral()
+    )
+    tx = aliased(Transaction, per_account)
+
+    query = (
+        select(tx)
+        .select_from(Account)
+        .join(per_account, true())
+        .options(joinedload(tx.category))
+        .where(Account.user_id == current_user.id)
+    )
+    if account_id:
+        query = query.where(Account.id == account_id)
+
+    result = await db.execute(
         query
-        .order_by(Transaction.date.desc(), Transaction.created_at.desc())
+        .order_by(tx.date.desc(), tx.created_at.desc(), tx.id.desc())
         .offset(offset)
         .limit(size)
-        .all()
     )
+    transactions = result.scalars().all()
+
+    if len(transactions) == size:
+        last = transactions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.created_at, last.id)
 
     return transactions
 
 
+@router.get("/search", response_model=List[TransactionResponse])
+async def search_transactions(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
+    q: str = Query(..., min_length=1, max_length=100),
+    mode: SearchMode = "substring",
+    account_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Search transactions by description or counterparty, best match first.
+    Modes: substring, prefix (start of a word) or fuzzy (typo tolerant).
+    """
+    return await db.run_sync(
+        lambda session: SearchService(session).search(
+            user_id=current_user.id,
+            query=q,
+            mode=mode,
+            account_id=account_id,
+            limit=limit,
+        )
+    )
+
+
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 def create_transaction(
     tx_data: TransactionCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Create a manual transaction."""
@@ -116,6 +185,7 @@ def create_transaction(
     )
     db.add(transaction)
     db.commit()
+    analytics_cache.bump_user_version(current_user.id)
     db.refresh(transaction, ["category"])
     return transaction
 
@@ -123,7 +193,7 @@ def create_transaction(
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 def get_transaction(
     transaction_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Get transaction by ID."""
@@ -149,7 +219,7 @@ def get_transaction(
 def update_transaction(
     transaction_id: UUID,
     tx_data: TransactionUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Update transaction."""
@@ -200,9 +270,11 @@ def update_transaction(
                 detail="Category not found",
             )
         transaction.category_id = tx_data.category_id
+        transaction.category_rule_id = None
 
     transaction.is_edited = True
     db.commit()
+    analytics_cache.bump_user_version(current_user.id)
     db.refresh(transaction, ["category"])
     return transaction
 
@@ -210,7 +282,7 @@ def update_transaction(
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_transaction(
     transaction_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Delete transaction."""
@@ -229,5 +301,8 @@ def delete_transaction(
             detail="Transaction not found",
         )
 
+    if transaction.upload_id:
+        UploadService(db).adjust_transaction_count(transaction.upload_id, -1)
     db.delete(transaction)
     db.commit()
+    analytics_cache.bump_user_version(current_user.id)
@@ -1,57 +1,51 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
-from app.models import User, Upload, Transaction
-from app.schemas import UploadResponse
+from app.api.deps import get_db, get_async_db, get_current_principal, Principal
+from app.config import settings
+from app.schemas import UploadResponse, UploadInitiate, UploadInitiateResponse
 from app.services import UploadService
+from app.services.upload import ALLOWED_CONTENT_TYPES
 from app.tasks.process_upload import process_upload_task
 
 router = APIRouter()
 
 
 @router.post("", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
-async def upload_file(
+def upload_file(
     file: UploadFile = File(...),
     account_id: UUID = Form(...),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
-    """Upload a bank statement file for processing."""
+    """
+    Upload a bank statement file for processing.
+    The file is streamed to storage in parts (sync route, so it runs in
+    the threadpool rather than on the event loop). Starlette has spooled
+    the whole body before this runs; BodySizeLimitMiddleware is what stops
+    an oversized body while it is received.
+    """
     # Validate file type
-    allowed_types = [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        "application/vnd.ms-excel",
-        "text/csv",
-    ]
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type not supported. Allowed: PDF, Excel, CSV",
         )
 
-    # Validate file size (max 10MB)
-    max_size = 10 * 1024 * 1024
-    content = await file.read()
-    if len(content) > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File too large. Maximum size is 10MB",
-        )
-
     try:
+        # Exact file size limit, checked while streaming to storage
         service = UploadService(db)
-        import io
         upload = service.create_upload(
             user_id=current_user.id,
             account_id=account_id,
-            file=io.BytesIO(content),
+            file=file.file,
             filename=file.filename,
             content_type=file.content_type,
+            max_size=settings.MAX_UPLOAD_SIZE,
         )
 
         # Queue processing task
@@ -66,35 +60,96 @@ async def upload_file(
         )
 
 
-@router.get("", response_model=List[UploadResponse])
-def get_uploads(
-    current_user: User = Depends(get_current_user),
+@router.post("/initiate", response_model=UploadInitiateResponse, status_code=status.HTTP_201_CREATED)
+def initiate_upload(
+    upload_data: UploadInitiate,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
-    account_id: Optional[UUID] = None,
-    upload_status: Optional[str] = None,
 ):
-    """Get upload history."""
+    """
+    Start a direct upload: returns a presigned URL the client PUTs the
+    file to (with its Content-Type header), then calls /complete.
+    """
     service = UploadService(db)
-    uploads = service.get_uploads(
-        user_id=current_user.id,
-        account_id=account_id,
-        status=upload_status,
+    try:
+        upload, upload_url = service.initiate_upload(
+            user_id=current_user.id,
+            account_id=upload_data.account_id,
+            filename=upload_data.filename,
+            content_type=upload_data.content_type,
+            size=upload_data.size,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except NotImplementedError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Direct uploads are not supported by the configured storage",
+        )
+
+    return UploadInitiateResponse(
+        upload=UploadResponse.model_validate(upload),
+        upload_url=upload_url,
+        expires_in=settings.UPLOAD_URL_EXPIRE_MINUTES * 60,
     )
 
-    # Add transaction count to each upload
-    for upload in uploads:
-        count = db.query(Transaction).filter(
-            Transaction.upload_id == upload.id
-        ).count()
-        upload.transaction_count = count
 
-    return uploads
+@router.post("/{upload_id}/complete", response_model=UploadResponse)
+def complete_upload(
+    upload_id: UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """Verify a direct upload (size, content type) and queue processing."""
+    service = UploadService(db)
+    try:
+        upload = service.complete_upload(upload_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found",
+        )
+
+    # Queue processing task
+    process_upload_task.delay(str(upload.id))
+
+    return upload
+
+
+@router.get("", response_model=List[UploadResponse])
+async def get_uploads(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
+    account_id: Optional[UUID] = None,
+    upload_status: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    size: int = Query(50, ge=1, le=100),
+):
+    """Get upload history, newest first."""
+    return await db.run_sync(
+        lambda session: UploadService(session).get_uploads(
+            user_id=current_user.id,
+            account_id=account_id,
+            status=upload_status,
+            page=page,
+            size=size,
+        )
+    )
 
 
 @router.get("/{upload_id}", response_model=UploadResponse)
 def get_upload(
     upload_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Get upload status by ID."""
@@ -107,19 +162,13 @@ def get_upload(
             detail="Upload not found",
         )
 
-    # Add transaction count
-    count = db.query(Transaction).filter(
-        Transaction.upload_id == upload.id
-    ).count()
-    upload.transaction_count = count
-
-    return upload
+    return service.with_transaction_count(upload)
 
 
 @router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_upload(
     upload_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Delete upload and all associated transactions."""
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, password_hasher_busy_exception
 from app.models import User
 from app.schemas import UserResponse, UserUpdate
 from app.services import AuthService
+from app.utils.security import PasswordHasherBusyError
 
 router = APIRouter()
 
@@ -16,16 +17,19 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.patch("/me", response_model=UserResponse)
-def update_current_user(
+async def update_current_user(
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Update current user profile."""
     service = AuthService(db)
-    updated_user = service.update_user(
-        user=current_user,
-        name=user_data.name,
-        password=user_data.password,
-    )
+    try:
+        updated_user = await service.update_user(
+            user=current_user,
+            name=user_data.name,
+            password=user_data.password,
+        )
+    except PasswordHasherBusyError as e:
+        raise password_hasher_busy_exception(e)
     return updated_user
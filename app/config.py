@@ -15,6 +15,7 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_SOCKET_TIMEOUT: float = 0.5
 
     # JWT
     JWT_SECRET_KEY: str
@@ -22,17 +23,74 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Authenticated user cache (TTL 0 disables it)
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_REDIS: bool = False
+
+    # Password hashing (bcrypt calls beyond workers + queue get a 503)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # Storage (STORAGE_BACKEND: minio, local or memory)
+    STORAGE_BACKEND: str = "minio"
+    LOCAL_STORAGE_PATH: str = "./data/storage"
+
     # MinIO
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "pfm-uploads"
     MINIO_SECURE: bool = False
+    # Host clients reach MinIO at, for presigned URLs (the host is signed
+    # too); empty means MINIO_ENDPOINT. With the region given, URLs for it
+    # are signed without a request to it.
+    MINIO_PUBLIC_ENDPOINT: str = ""
+    MINIO_PUBLIC_SECURE: bool = False
+    MINIO_REGION: str = "us-east-1"
+
+    # Uploads (part size is the per-upload memory bound, min 5 MiB)
+    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024
+    UPLOAD_PART_SIZE: int = 5 * 1024 * 1024
+    UPLOAD_URL_EXPIRE_MINUTES: int = 15
+    # Multipart framing and form fields allowed on top of MAX_UPLOAD_SIZE
+    # in a POST /uploads body
+    UPLOAD_FORM_OVERHEAD: int = 64 * 1024
+    # Direct uploads not completed this long after initiate are deleted
+    # (keep it above UPLOAD_URL_EXPIRE_MINUTES)
+    UPLOAD_ABANDONED_AFTER_MINUTES: int = 60
 
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
 
+    # Ingestion
+    INGEST_BATCH_SIZE: int = 1000
+
+    # Transaction partitions (monthly, created this many months ahead)
+    TRANSACTION_PARTITION_MONTHS_AHEAD: int = 3
+
+    # Parsing (PARSER_WORKERS=0 uses all CPUs)
+    PARSER_WORKERS: int = 0
+    PARSER_PARALLEL_MIN_PAGES: int = 20
+
+    # Categorization
+    RULE_CACHE_SIZE: int = 256
+    RECATEGORIZE_CHUNK_SIZE: int = 5000
+
+    # Parse cache (statements with more rows are not cached)
+    PARSE_CACHE_ENABLED: bool = True
+    PARSE_CACHE_MAX_ROWS: int = 100000
+
+    # Transaction search (word similarity cut-off for fuzzy mode)
+    SEARCH_FUZZY_THRESHOLD: float = 0.5
+
+    # Analytics cache (TTL 0 disables it; periods still open may be served
+    # up to STALE seconds behind the latest write while being refreshed)
+    ANALYTICS_CACHE_TTL_SECONDS: int = 86400
+    ANALYTICS_CACHE_STALE_SECONDS: int = 300
+
     # CORS
     CORS_ORIGINS: str = '["http://localhost:3000"]'
 
@@ -1,15 +1,23 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
+from app.api.middleware import BodySizeLimitMiddleware
 from app.api.v1.router import api_router
+from app.services.rule_cache import rule_set_cache
+from app.services.user_cache import user_cache
+from app.services.analytics_cache import analytics_cache
+from app.utils.security import password_hasher
+from app.utils.storage import init_storage
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await run_in_threadpool(init_storage)
     yield
     # Shutdown
 
@@ -24,13 +32,22 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS
+# Oversized statement uploads are refused while being received
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        f"{settings.API_V1_PREFIX}/uploads": settings.MAX_UPLOAD_SIZE + settings.UPLOAD_FORM_OVERHEAD,
+    },
+)
+
+# CORS (added last, so it also wraps the responses above)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -43,6 +60,17 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+def metrics():
+    """In-process cache and executor counters."""
+    return {
+        "rule_set_cache": rule_set_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "analytics_cache": analytics_cache.stats(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
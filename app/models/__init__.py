@@ -5,6 +5,8 @@ from app.models.category import Category
 from app.models.transaction import Transaction
 from app.models.upload import Upload
 from app.models.categorization_rule import CategorizationRule
+from app.models.recategorization_job import RecategorizationJob
+from app.models.daily_aggregate import DailyAggregate
 
 __all__ = [
     "User",
@@ -14,4 +16,6 @@ __all__ = [
     "Transaction",
     "Upload",
     "CategorizationRule",
+    "RecategorizationJob",
+    "DailyAggregate",
 ]
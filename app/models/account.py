@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import Boolean, String, DateTime, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -23,6 +23,9 @@ class Account(Base):
     name: Mapped[str] = mapped_column(String(100))
     currency: Mapped[str] = mapped_column(String(3))  # KGS, USD, RUB
     account_number: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    # daily_aggregates hold this account's full history (new accounts
+    # start complete; older ones once backfilled)
+    rollup_ready: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow
     )
@@ -0,0 +1,41 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class DailyAggregate(Base):
+    """
+    Per-day rollup of transactions for analytics.
+
+    Kept in step with `transactions` by database triggers (migration
+    010), so every write path - ingestion, manual edits, recategorization,
+    cascades - updates it. Rows of an account are only complete once
+    Account.rollup_ready is set by the backfill.
+    """
+
+    __tablename__ = "daily_aggregates"
+    __table_args__ = (
+        UniqueConstraint(
+            "account_id", "date", "category_id", "type",
+            name="uq_daily_aggregates_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("accounts.id", ondelete="CASCADE")
+    )
+    # No foreign key: rows of a deleted category are drained by the
+    # trigger when its transactions are moved to uncategorized
+    category_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    date: Mapped[date] = mapped_column(Date)
+    type: Mapped[str] = mapped_column(String(10))
+    amount: Mapped[Decimal] = mapped_column(Numeric(18, 2))
+    count: Mapped[int] = mapped_column(Integer)
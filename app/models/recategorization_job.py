@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime, Integer, Text, ForeignKey, Index, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class RecategorizationJob(Base):
+    __tablename__ = "recategorization_jobs"
+    __table_args__ = (
+        Index("ix_recategorization_jobs_user", "user_id"),
+        # At most one unfinished job per user
+        Index(
+            "ix_recategorization_jobs_user_active",
+            "user_id",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
+    )
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, running (also while retrying), done, error
+    total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    processed: Mapped[int] = mapped_column(Integer, default=0)
+    updated: Mapped[int] = mapped_column(Integer, default=0)
+    # Checkpoint: last transaction id of the last committed chunk
+    last_transaction_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Relationships
+    user = relationship("User", back_populates="recategorization_jobs")
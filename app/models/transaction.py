@@ -12,9 +12,24 @@ from app.database import Base
 class Transaction(Base):
     __tablename__ = "transactions"
     __table_args__ = (
-        Index("ix_transactions_account_date", "account_id", "date"),
+        Index("ix_transactions_account_keyset", "account_id", "date", "created_at", "id"),
         Index("ix_transactions_category", "category_id"),
         Index("ix_transactions_upload", "upload_id"),
+        Index("ix_transactions_category_rule", "category_rule_id"),
+        # Unique indexes must include the partition key; the date is part
+        # of the fingerprint, so this is as strict as fingerprint alone
+        Index("ix_transactions_fingerprint", "fingerprint", "date", unique=True),
+        # Trigram indexes for search (pg_trgm)
+        Index(
+            "ix_transactions_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_transactions_counterparty_trgm", "counterparty",
+            postgresql_using="gin", postgresql_ops={"counterparty": "gin_trgm_ops"},
+        ),
+        # One partition per month (migration 011, app.services.partitions)
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -29,10 +44,15 @@ class Transaction(Base):
     category_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID(as_uuid=True), ForeignKey("categories.id", ondelete="SET NULL"), nullable=True
     )
+    # Rule that assigned category_id (None for manual or uncategorized)
+    category_rule_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("categorization_rules.id", ondelete="SET NULL"), nullable=True
+    )
 
     amount: Mapped[Decimal] = mapped_column(Numeric(15, 2))
     type: Mapped[str] = mapped_column(String(10))  # income, expense, transfer
-    date: Mapped[date] = mapped_column(Date)
+    # Part of the primary key as the partition key
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     counterparty: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
@@ -41,6 +61,10 @@ class Transaction(Base):
     original_description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     original_counterparty: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
+    # Identity of an imported statement row, used to skip re-imports
+    # (None for manually created transactions)
+    fingerprint: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+
     is_edited: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, Text, ForeignKey
+from sqlalchemy import String, DateTime, Integer, Text, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -22,8 +22,11 @@ class Upload(Base):
     )
     filename: Mapped[str] = mapped_column(String(255))
     file_path: Mapped[str] = mapped_column(String(500))
-    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, processing, done, error
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # sha256 hex
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # uploading, pending, processing, done, error
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Transactions imported from this file (None until counted)
+    transaction_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     uploaded_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow
     )
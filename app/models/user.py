@@ -27,3 +27,6 @@ class User(Base):
     categorization_rules = relationship(
         "CategorizationRule", back_populates="user", cascade="all, delete-orphan"
     )
+    recategorization_jobs = relationship(
+        "RecategorizationJob", back_populates="user", cascade="all, delete-orphan"
+    )
@@ -1,13 +1,23 @@
-import io
 import re
 from datetime import datetime, date
-from decimal import Decimal
-from typing import List
+from decimal import Decimal, InvalidOperation
+from typing import Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
-import pdfplumber
+from pandas.api.types import is_datetime64_any_dtype
 
-from app.parsers.base import BaseParser, ParsedTransaction
+from app.parsers.base import BaseParser, ParsedTransaction, ParserInput, open_input
+from app.parsers.pdf import iter_page_tables
+
+DATE_FORMATS = ["%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d.%m.%y"]
+
+COUNTERPARTY_PREFIX = re.compile(r"^(Оплата|Перевод|Покупка|Снятие|Пополнение)\s*:?\s*", re.I)
+COUNTERPARTY_PATTERNS = [
+    re.compile(r"от\s+(.+?)(?:\s*$|\s+на\s)"),
+    re.compile(r"в\s+(.+?)(?:\s*$|\s+за\s)"),
+    re.compile(r"^([A-Za-zА-Яа-я\s]+?)(?:\s+\d|\s*$)"),
+]
 
 
 class BakaiBankParser(BaseParser):
@@ -16,7 +26,9 @@ class BakaiBankParser(BaseParser):
     Supports both PDF and Excel formats.
     """
 
-    def parse(self, file_content: bytes, filename: str) -> List[ParsedTransaction]:
+    version = 1
+
+    def iter_parse(self, file_content: ParserInput, filename: str) -> Iterator[ParsedTransaction]:
         ext = self.get_file_extension(filename)
 
         if ext in ("xlsx", "xls"):
@@ -26,15 +38,21 @@ class BakaiBankParser(BaseParser):
         else:
             raise ValueError(f"Unsupported file format: {ext}")
 
-    def _parse_excel(self, file_content: bytes) -> List[ParsedTransaction]:
+    def _parse_excel(self, file_content: ParserInput) -> Iterator[ParsedTransaction]:
         """Parse Excel bank statement."""
-        transactions: List[ParsedTransaction] = []
-
-        df = pd.read_excel(io.BytesIO(file_content))
+        df = pd.read_excel(open_input(file_content))
 
         # Normalize column names
         df.columns = [str(col).lower().strip() for col in df.columns]
 
+        yield from self._parse_excel_frame(df)
+
+    def _parse_excel_frame(self, df: pd.DataFrame) -> Iterator[ParsedTransaction]:
+        """
+        Parse a statement sheet column-wise.
+        Rows are kept or dropped by boolean masks; Decimal amounts are
+        built only for the rows that survive.
+        """
         # Find relevant columns
         date_col = self._find_df_column(df, ["дата", "date", "дата операции"])
         desc_col = self._find_df_column(df, ["описание", "description", "назначение", "детали"])
@@ -42,62 +60,65 @@ class BakaiBankParser(BaseParser):
         income_col = self._find_df_column(df, ["приход", "credit", "зачисление", "дебет"])
         expense_col = self._find_df_column(df, ["расход", "debit", "списание", "кредит"])
 
-        for _, row in df.iterrows():
-            try:
-                # Parse date
-                tx_date = self._parse_excel_date(row.get(date_col))
-                if not tx_date:
-                    continue
+        if date_col is None or df.empty:
+            return
 
-                # Parse amount
-                if income_col and expense_col:
-                    income_val = self._parse_excel_amount(row.get(income_col))
-                    expense_val = self._parse_excel_amount(row.get(expense_col))
-
-                    if income_val and income_val > 0:
-                        amount, tx_type = income_val, "income"
-                    elif expense_val and expense_val > 0:
-                        amount, tx_type = expense_val, "expense"
-                    else:
-                        continue
-                elif amount_col:
-                    amount = self._parse_excel_amount(row.get(amount_col))
-                    if not amount:
-                        continue
-                    tx_type = "income" if amount > 0 else "expense"
-                    amount = abs(amount)
-                else:
-                    continue
+        # Parse dates
+        dates = self._excel_dates(df[date_col])
+        keep = dates.notna().to_numpy()
 
-                # Parse description
-                description = str(row.get(desc_col, "")).strip() or None
-                counterparty = self._extract_counterparty(description)
+        # Parse amounts
+        if income_col and expense_col:
+            income_text, income_values, income_valid = self._excel_amounts(df[income_col])
+            expense_text, expense_values, expense_valid = self._excel_amounts(df[expense_col])
 
-                transactions.append(ParsedTransaction(
-                    amount=amount,
-                    type=tx_type,
-                    date=tx_date,
-                    description=description,
-                    counterparty=counterparty,
-                ))
+            use_income = (income_values > 0).to_numpy()
+            use_expense = (expense_values > 0).to_numpy()
 
-            except Exception:
-                continue
+            # A NaN income cannot be compared, which skips the row
+            income_nan = (income_text.notna() & income_values.isna()).to_numpy()
 
-        return transactions
+            keep &= income_valid & expense_valid & ~income_nan & (use_income | use_expense)
+            amount_text = np.where(use_income, income_text, expense_text)
+            tx_types = np.where(use_income, "income", "expense")
+        elif amount_col:
+            amount_text, values, valid = self._excel_amounts(df[amount_col])
 
-    def _parse_pdf(self, file_content: bytes) -> List[ParsedTransaction]:
-        """Parse PDF bank statement."""
-        transactions: List[ParsedTransaction] = []
+            keep &= valid & (values.notna() & (values != 0)).to_numpy()
+            amount_text = amount_text.to_numpy()
+            tx_types = np.where(values > 0, "income", "expense")
+        else:
+            return
 
-        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-            for page in pdf.pages:
-                # Extract tables
-                tables = page.extract_tables()
-                for table in tables:
-                    transactions.extend(self._parse_pdf_table(table))
+        # Parse descriptions
+        if desc_col:
+            descriptions = df[desc_col].map(str).str.strip()
+            counterparties = self._extract_counterparties(descriptions).to_numpy()
+            descriptions = descriptions.to_numpy()
+        else:
+            descriptions = counterparties = np.full(len(df), None, dtype=object)
 
-        return transactions
+        dates = dates.to_numpy()
+
+        for i in np.flatnonzero(keep):
+            try:
+                amount = abs(Decimal(amount_text[i]))
+            except InvalidOperation:
+                continue
+
+            yield ParsedTransaction(
+                amount=amount,
+                type=str(tx_types[i]),
+                date=dates[i],
+                description=descriptions[i] or None,
+                counterparty=counterparties[i],
+            )
+
+    def _parse_pdf(self, file_content: ParserInput) -> Iterator[ParsedTransaction]:
+        """Parse PDF bank statement, one page at a time."""
+        for tables in iter_page_tables(file_content):
+            for table in tables:
+                yield from self._parse_pdf_table(table)
 
     def _parse_pdf_table(self, table: List[List[str]]) -> List[ParsedTransaction]:
         """Parse a single table from PDF."""
@@ -166,39 +187,76 @@ class BakaiBankParser(BaseParser):
                     return col
         return None
 
-    def _parse_excel_date(self, val) -> date:
-        """Parse date from Excel cell."""
-        if val is None or pd.isna(val):
-            return None
-
-        if isinstance(val, datetime):
-            return val.date()
-        if isinstance(val, date):
-            return val
-
-        return self._parse_date_str(str(val))
-
-    def _parse_excel_amount(self, val) -> Decimal:
-        """Parse amount from Excel cell."""
-        if val is None or pd.isna(val):
-            return None
-
-        if isinstance(val, (int, float)):
-            return Decimal(str(val))
-
-        val_str = str(val).strip()
-        if not val_str or val_str == "-":
-            return None
+    def _excel_dates(self, series: pd.Series) -> pd.Series:
+        """Parse a date column; unparseable cells become None."""
+        if is_datetime64_any_dtype(series):
+            return series.dt.date.where(series.notna(), None)
+
+        dates = pd.Series(None, index=series.index, dtype=object)
+        present = series.notna()
+
+        # Cells already holding date/datetime objects
+        kinds = series.map(type)
+        is_date = kinds.map({kind: issubclass(kind, date) for kind in kinds.unique()}).astype(bool)
+        date_cells = series[present & is_date]
+        dates[date_cells.index] = date_cells.map(
+            lambda val: val.date() if isinstance(val, datetime) else val
+        )
+
+        # Everything else is parsed as text, trying formats in order
+        pending = series[present & ~is_date].astype(str).str.slice(0, 10)
+        pending = pending[pending != ""]
+        for fmt in DATE_FORMATS:
+            if pending.empty:
+                break
+            parsed = pd.to_datetime(pending, format=fmt, errors="coerce")
+            matched = parsed.notna()
+            dates[pending.index[matched]] = parsed[matched].dt.date
+            pending = pending[~matched]
+
+        # Cells pandas rejects (e.g. out of Timestamp range) get the slow path
+        for idx, date_str in pending.items():
+            dates[idx] = self._parse_date_str(date_str)
+
+        return dates
+
+    def _excel_amounts(self, series: pd.Series) -> Tuple[pd.Series, pd.Series, np.ndarray]:
+        """
+        Clean an amount column the way parse_amount does.
+        Returns the cleaned text (None for empty cells), its float value
+        for masking (NaN when empty), and a mask of cells that are empty
+        or parse as a Decimal.
+        """
+        text = series.astype(str).str.strip()
+        present = series.notna() & ~text.isin(["", "-"])
+
+        # Remove spaces, decimal comma to dot, drop all but the last dot
+        cleaned = (
+            text.str.replace(" ", "", regex=False)
+            .str.replace(",", ".", regex=False)
+            .str.replace(r"\.(?=[^.]*\.)", "", regex=True)
+            .where(present, None)
+        )
+        values = pd.to_numeric(cleaned, errors="coerce")
+        valid = np.ones(len(series), dtype=bool)
+
+        # Text pandas can't read may still be a Decimal ("NaN", "1_000")
+        for pos in np.flatnonzero((present & values.isna()).to_numpy()):
+            try:
+                values.iat[pos] = float(Decimal(cleaned.iat[pos]))
+            except InvalidOperation:
+                valid[pos] = False
+            except ValueError:
+                pass  # sNaN: parses, but is not comparable
 
-        return self.parse_amount(val_str)
+        return cleaned, values, valid
 
     def _parse_date_str(self, date_str: str) -> date:
         """Parse date string."""
         if not date_str:
             return None
 
-        formats = ["%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d.%m.%y"]
-        for fmt in formats:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.strptime(date_str[:10], fmt).date()
             except ValueError:
@@ -212,17 +270,11 @@ class BakaiBankParser(BaseParser):
             return None
 
         # Clean up common prefixes
-        description = re.sub(r"^(Оплата|Перевод|Покупка|Снятие|Пополнение)\s*:?\s*", "", description, flags=re.I)
+        description = COUNTERPARTY_PREFIX.sub("", description)
 
         # Extract merchant/counterparty name
-        patterns = [
-            r"от\s+(.+?)(?:\s*$|\s+на\s)",
-            r"в\s+(.+?)(?:\s*$|\s+за\s)",
-            r"^([A-Za-zА-Яа-я\s]+?)(?:\s+\d|\s*$)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, description)
+        for pattern in COUNTERPARTY_PATTERNS:
+            match = pattern.search(description)
             if match:
                 counterparty = match.group(1).strip()
                 if len(counterparty) > 2:
@@ -234,3 +286,23 @@ class BakaiBankParser(BaseParser):
             return " ".join(words)[:255]
 
         return None
+
+    def _extract_counterparties(self, descriptions: pd.Series) -> pd.Series:
+        """Column-wise _extract_counterparty over a Series of strings."""
+        # Statements repeat descriptions a lot; extract once per distinct value
+        codes, uniques = pd.factorize(descriptions)
+        cleaned = pd.Series(uniques, dtype=object).str.replace(COUNTERPARTY_PREFIX, "", regex=True)
+        counterparties = pd.Series(None, index=cleaned.index, dtype=object)
+
+        for pattern in COUNTERPARTY_PATTERNS:
+            pending = cleaned[counterparties.isna()]
+            found = pending.str.extract(pattern, expand=False).str.strip()
+            counterparties = counterparties.fillna(found[found.str.len() > 2])
+
+        # Fallback: take first few words
+        pending = cleaned[counterparties.isna()]
+        words = pending.str.split().str[:3].str.join(" ")
+        counterparties = counterparties.fillna(words[words != ""])
+
+        counterparties = counterparties.str.slice(0, 255).where(counterparties.notna(), None)
+        return pd.Series(counterparties.to_numpy()[codes], index=descriptions.index, dtype=object)
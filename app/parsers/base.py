@@ -1,7 +1,9 @@
+import io
+import os
 from abc import ABC, abstractmethod
 from datetime import date
 from decimal import Decimal
-from typing import List, TypedDict, Optional
+from typing import BinaryIO, Iterator, List, TypedDict, Optional, Union
 
 
 class ParsedTransaction(TypedDict):
@@ -12,23 +14,50 @@ class ParsedTransaction(TypedDict):
     counterparty: Optional[str]
 
 
+# Raw bytes, a path to the file on disk, or a binary file object
+ParserInput = Union[bytes, str, os.PathLike, BinaryIO]
+
+
+def open_input(source: ParserInput) -> Union[str, os.PathLike, BinaryIO]:
+    """Adapt parser input for libraries that take a path or file object."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
 class BaseParser(ABC):
     """Base class for bank statement parsers."""
 
+    # Bump whenever a change alters parse output; cached results of
+    # older versions are then ignored.
+    version: int = 1
+
     @abstractmethod
-    def parse(self, file_content: bytes, filename: str) -> List[ParsedTransaction]:
+    def iter_parse(self, file_content: ParserInput, filename: str) -> Iterator[ParsedTransaction]:
         """
-        Parse a bank statement file and extract transactions.
+        Parse a bank statement file and yield transactions as they are found.
+
+        Implementations should yield page by page (or chunk by chunk) so
+        callers can process large statements in bounded memory.
 
         Args:
-            file_content: Raw file content as bytes
+            file_content: Raw file content as bytes, or the path of (or an
+                open binary handle to) the file; a path keeps the file
+                out of memory
             filename: Original filename (used to determine file type)
 
-        Returns:
-            List of parsed transactions
+        Yields:
+            Parsed transactions in statement order
         """
         pass
 
+    def parse(self, file_content: ParserInput, filename: str) -> List[ParsedTransaction]:
+        """
+        Parse a bank statement file and extract all transactions.
+        Thin wrapper over iter_parse kept for compatibility.
+        """
+        return list(self.iter_parse(file_content, filename))
+
     def get_file_extension(self, filename: str) -> str:
         """Extract file extension from filename."""
         return filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
@@ -1,12 +1,10 @@
-import io
 import re
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List
+from typing import Iterator, List
 
-import pdfplumber
-
-from app.parsers.base import BaseParser, ParsedTransaction
+from app.parsers.base import BaseParser, ParsedTransaction, ParserInput
+from app.parsers.pdf import iter_page_tables
 
 
 class MbankPdfParser(BaseParser):
@@ -19,16 +17,12 @@ class MbankPdfParser(BaseParser):
     - Amounts with +/- sign or in separate columns
     """
 
-    def parse(self, file_content: bytes, filename: str) -> List[ParsedTransaction]:
-        transactions: List[ParsedTransaction] = []
-
-        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables()
-                for table in tables:
-                    transactions.extend(self._parse_table(table))
+    version = 1
 
-        return transactions
+    def iter_parse(self, file_content: ParserInput, filename: str) -> Iterator[ParsedTransaction]:
+        for tables in iter_page_tables(file_content):
+            for table in tables:
+                yield from self._parse_table(table)
 
     def _parse_table(self, table: List[List[str]]) -> List[ParsedTransaction]:
         """Parse a single table from PDF."""
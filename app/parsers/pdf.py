@@ -0,0 +1,110 @@
+import logging
+import math
+import os
+from typing import Iterator, List, Optional, Tuple
+
+import pdfplumber
+from billiard.exceptions import WorkerLostError
+from billiard.pool import Pool
+
+from app.config import settings
+from app.parsers.base import ParserInput, open_input
+
+logger = logging.getLogger(__name__)
+
+Table = List[List[Optional[str]]]
+
+# Statement path (or content), set once per pool worker
+_worker_source: Optional[ParserInput] = None
+
+
+def _init_worker(source: ParserInput) -> None:
+    global _worker_source
+    _worker_source = source
+
+
+def _extract_page_range(page_range: Tuple[int, int]) -> List[List[Table]]:
+    start, stop = page_range
+    with pdfplumber.open(open_input(_worker_source)) as pdf:
+        return [_extract_tables(pdf.pages[i]) for i in range(start, stop)]
+
+
+def _extract_tables(page: pdfplumber.page.Page) -> List[Table]:
+    tables = page.extract_tables()
+    page.flush_cache()  # Drop parsed layout objects once tables are out
+    return tables
+
+
+def _worker_count() -> int:
+    if settings.PARSER_WORKERS:
+        return settings.PARSER_WORKERS
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _split_pages(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    # A few ranges per worker so uneven pages do not leave workers idle
+    size = max(1, math.ceil(page_count / (workers * 4)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _is_path(source: ParserInput) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def iter_page_tables(source: ParserInput) -> Iterator[List[Table]]:
+    """
+    Yield the tables of every page of a PDF, one page at a time, in order.
+
+    `source` is the file content, its path or an open binary file. Prefer
+    a path: pdfplumber then reads from disk and pool workers open the file
+    themselves instead of receiving a pickled copy of the content.
+
+    Statements with at least PARSER_PARALLEL_MIN_PAGES pages are split into
+    page ranges and extracted in a process pool of PARSER_WORKERS workers;
+    smaller ones and file objects (which cannot be shared with workers)
+    stay serial. The result is the same in both modes.
+
+    The pool is billiard's (Celery's multiprocessing fork), which, unlike
+    the stdlib one, may be started from the daemonic processes of a
+    prefork Celery worker. If it still cannot start, parsing continues
+    serially with a warning.
+    """
+    shareable = _is_path(source) or isinstance(source, (bytes, bytearray))
+    with pdfplumber.open(open_input(source)) as pdf:
+        page_count = len(pdf.pages)
+        workers = min(_worker_count(), page_count)
+        if (
+            not shareable
+            or workers <= 1
+            or page_count < settings.PARSER_PARALLEL_MIN_PAGES
+        ):
+            for page in pdf.pages:
+                yield _extract_tables(page)
+            return
+
+    next_page = 0
+    try:
+        # Leaving the block (also when the consumer stops early) terminates the pool
+        with Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(os.fspath(source) if _is_path(source) else source,),
+        ) as pool:
+            ranges = _split_pages(page_count, workers)
+            for chunk in pool.imap(_extract_page_range, ranges):
+                for tables in chunk:
+                    yield tables
+                    next_page += 1
+            return
+    except (AssertionError, OSError, WorkerLostError) as e:
+        logger.warning(
+            "Parallel PDF parsing unavailable, parsing %d remaining pages serially: %s",
+            page_count - next_page, e,
+        )
+
+    # Continue after the pages already yielded
+    with pdfplumber.open(open_input(source)) as pdf:
+        for page in pdf.pages[next_page:]:
+            yield _extract_tables(page)
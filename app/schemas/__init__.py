@@ -8,8 +8,9 @@ from app.schemas.transaction import (
     TransactionResponse,
     TransactionFilter,
 )
-from app.schemas.upload import UploadResponse
+from app.schemas.upload import UploadResponse, UploadInitiate, UploadInitiateResponse
 from app.schemas.categorization_rule import RuleCreate, RuleResponse
+from app.schemas.recategorization_job import RecategorizationJobResponse
 from app.schemas.analytics import SummaryResponse, CategoryStats, PeriodStats
 from app.schemas.common import Token, TokenPayload, PaginatedResponse
 
@@ -30,8 +31,11 @@ __all__ = [
     "TransactionResponse",
     "TransactionFilter",
     "UploadResponse",
+    "UploadInitiate",
+    "UploadInitiateResponse",
     "RuleCreate",
     "RuleResponse",
+    "RecategorizationJobResponse",
     "SummaryResponse",
     "CategoryStats",
     "PeriodStats",
@@ -59,3 +59,13 @@ class AnalyticsByAccountResponse(BaseModel):
     date_from: date
     date_to: date
     accounts: List[AccountStats]
+
+
+class DashboardResponse(BaseModel):
+    date_from: date
+    date_to: date
+    summary: SummaryResponse
+    income_by_category: AnalyticsByCategoryResponse
+    expense_by_category: AnalyticsByCategoryResponse
+    by_period: AnalyticsByPeriodResponse
+    by_account: AnalyticsByAccountResponse
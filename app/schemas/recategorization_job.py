@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional, Literal
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class RecategorizationJobResponse(BaseModel):
+    id: UUID
+    status: Literal["pending", "running", "done", "error"]
+    total: Optional[int]
+    processed: int
+    updated: int
+    rows_per_sec: Optional[float] = None
+    error_message: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -34,6 +34,7 @@ class TransactionResponse(TransactionBase):
     account_id: UUID
     upload_id: Optional[UUID]
     category_id: Optional[UUID]
+    category_rule_id: Optional[UUID] = None
     original_amount: Optional[Decimal]
     original_description: Optional[str]
     original_counterparty: Optional[str]
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, Literal
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UploadResponse(BaseModel):
@@ -10,7 +10,8 @@ class UploadResponse(BaseModel):
     account_id: UUID
     filename: str
     file_path: str
-    status: Literal["pending", "processing", "done", "error"]
+    content_hash: Optional[str] = None
+    status: Literal["uploading", "pending", "processing", "done", "error"]
     error_message: Optional[str]
     uploaded_at: datetime
     processed_at: Optional[datetime]
@@ -18,3 +19,16 @@ class UploadResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UploadInitiate(BaseModel):
+    account_id: UUID
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    size: int = Field(..., gt=0)
+
+
+class UploadInitiateResponse(BaseModel):
+    upload: UploadResponse
+    upload_url: str
+    expires_in: int  # seconds
@@ -2,10 +2,16 @@ from app.services.auth import AuthService
 from app.services.upload import UploadService
 from app.services.categorization import CategorizationService
 from app.services.analytics import AnalyticsService
+from app.services.ingestion import IngestionService
+from app.services.search import SearchService
+from app.services.rollup import RollupService
 
 __all__ = [
     "AuthService",
     "UploadService",
     "CategorizationService",
     "AnalyticsService",
+    "IngestionService",
+    "SearchService",
+    "RollupService",
 ]
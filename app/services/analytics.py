@@ -1,49 +1,123 @@
 from datetime import date
 from decimal import Decimal
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import func, case
+from sqlalchemy import func, case, literal, literal_column, select, tuple_, union_all
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Subquery
 
-from app.models import Transaction, Category, Account
+from app.models import Transaction, Category, Account, DailyAggregate
 from app.schemas.analytics import (
     SummaryResponse,
     CategoryStats,
     PeriodStats,
     AccountStats,
+    AnalyticsByCategoryResponse,
+    AnalyticsByPeriodResponse,
+    AnalyticsByAccountResponse,
+    DashboardResponse,
 )
 
+Grouping = Literal["day", "week", "month"]
+
+
+def _period_expr(grouping: Grouping, column) -> Tuple[ColumnElement, str]:
+    """date_trunc expression for a grouping and the strftime format of its label."""
+    # Rendered inline so the identical expression in SELECT and GROUP BY
+    # also matches under drivers with server-side parameters
+    if grouping == "day":
+        return func.date_trunc(literal_column("'day'"), column), "%Y-%m-%d"
+    if grouping == "week":
+        return func.date_trunc(literal_column("'week'"), column), "%Y-W%W"
+    return func.date_trunc(literal_column("'month'"), column), "%Y-%m"
+
 
 class AnalyticsService:
+    """
+    Aggregates over a user's transactions.
+
+    Reports are computed from the daily_aggregates rollup (one row per
+    account, day, category and type) for accounts whose rollup is
+    complete, and from raw transactions for accounts still waiting for
+    their backfill, so answers are the same either way.
+    """
+
     def __init__(self, db: Session):
         self.db = db
 
-    def get_summary(
+    def _is_postgresql(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def _facts(
         self,
         user_id: UUID,
         date_from: date,
         date_to: date,
         account_ids: Optional[List[UUID]] = None,
-    ) -> SummaryResponse:
-        query = (
-            self.db.query(
-                func.sum(case((Transaction.type == "income", Transaction.amount), else_=Decimal(0))).label("income"),
-                func.sum(case((Transaction.type == "expense", Transaction.amount), else_=Decimal(0))).label("expense"),
-                func.count(Transaction.id).label("count"),
+    ) -> Subquery:
+        """
+        (account_id, category_id, date, type, amount, count) rows covering
+        the user's transactions in the range.
+        """
+        raw = (
+            select(
+                Transaction.account_id,
+                Transaction.category_id,
+                Transaction.date,
+                Transaction.type,
+                Transaction.amount,
+                literal(1).label("count"),
             )
-            .join(Account)
-            .filter(
+            .join(Account, Transaction.account_id == Account.id)
+            .where(
                 Account.user_id == user_id,
                 Transaction.date >= date_from,
                 Transaction.date <= date_to,
             )
         )
+        if account_ids:
+            raw = raw.where(Transaction.account_id.in_(account_ids))
 
+        # The rollup is maintained by triggers that only exist on PostgreSQL
+        if not self._is_postgresql():
+            return raw.subquery("facts")
+
+        rolled_up = (
+            select(
+                DailyAggregate.account_id,
+                DailyAggregate.category_id,
+                DailyAggregate.date,
+                DailyAggregate.type,
+                DailyAggregate.amount,
+                DailyAggregate.count,
+            )
+            .join(Account, DailyAggregate.account_id == Account.id)
+            .where(
+                Account.user_id == user_id,
+                Account.rollup_ready == True,
+                DailyAggregate.date >= date_from,
+                DailyAggregate.date <= date_to,
+            )
+        )
         if account_ids:
-            query = query.filter(Transaction.account_id.in_(account_ids))
+            rolled_up = rolled_up.where(DailyAggregate.account_id.in_(account_ids))
 
-        result = query.first()
+        return union_all(rolled_up, raw.where(Account.rollup_ready == False)).subquery("facts")
+
+    def get_summary(
+        self,
+        user_id: UUID,
+        date_from: date,
+        date_to: date,
+        account_ids: Optional[List[UUID]] = None,
+    ) -> SummaryResponse:
+        facts = self._facts(user_id, date_from, date_to, account_ids)
+        result = self.db.query(
+            func.sum(case((facts.c.type == "income", facts.c.amount), else_=Decimal(0))).label("income"),
+            func.sum(case((facts.c.type == "expense", facts.c.amount), else_=Decimal(0))).label("expense"),
+            func.sum(facts.c.count).label("count"),
+        ).first()
 
         total_income = result.income or Decimal(0)
         total_expense = result.expense or Decimal(0)
@@ -65,88 +139,45 @@ class AnalyticsService:
         transaction_type: Literal["income", "expense"] = "expense",
         account_ids: Optional[List[UUID]] = None,
     ) -> List[CategoryStats]:
-        query = (
+        facts = self._facts(user_id, date_from, date_to, account_ids)
+        results = (
             self.db.query(
-                Category.id,
-                Category.name,
-                func.sum(Transaction.amount).label("total"),
-                func.count(Transaction.id).label("count"),
-            )
-            .outerjoin(Transaction, Transaction.category_id == Category.id)
-            .join(Account, Transaction.account_id == Account.id)
-            .filter(
-                Account.user_id == user_id,
-                Transaction.date >= date_from,
-                Transaction.date <= date_to,
-                Transaction.type == transaction_type,
+                Category.id.label("category_id"),
+                Category.name.label("category_name"),
+                func.sum(facts.c.amount).label("total"),
+                func.sum(facts.c.count).label("count"),
             )
+            .join(facts, facts.c.category_id == Category.id)
+            .filter(facts.c.type == transaction_type)
             .group_by(Category.id, Category.name)
+            .all()
         )
 
-        if account_ids:
-            query = query.filter(Transaction.account_id.in_(account_ids))
-
-        results = query.all()
-
-        # Calculate total for percentages
-        total = sum(r.total or Decimal(0) for r in results)
-
-        stats = []
-        for r in results:
-            amount = r.total or Decimal(0)
-            stats.append(CategoryStats(
-                category_id=r.id,
-                category_name=r.name or "Uncategorized",
-                total_amount=amount,
-                transaction_count=r.count or 0,
-                percentage=float(amount / total * 100) if total > 0 else 0,
-            ))
-
-        # Sort by amount descending
-        stats.sort(key=lambda x: x.total_amount, reverse=True)
-        return stats
+        return self._category_stats(results)
 
     def get_by_period(
         self,
         user_id: UUID,
         date_from: date,
         date_to: date,
-        grouping: Literal["day", "week", "month"] = "month",
+        grouping: Grouping = "month",
         account_ids: Optional[List[UUID]] = None,
     ) -> List[PeriodStats]:
-        # Build date truncation expression based on grouping
-        if grouping == "day":
-            date_expr = func.date_trunc("day", Transaction.date)
-            format_str = "%Y-%m-%d"
-        elif grouping == "week":
-            date_expr = func.date_trunc("week", Transaction.date)
-            format_str = "%Y-W%W"
-        else:  # month
-            date_expr = func.date_trunc("month", Transaction.date)
-            format_str = "%Y-%m"
-
-        query = (
+        facts = self._facts(user_id, date_from, date_to, account_ids)
+        date_expr, format_str = _period_expr(grouping, facts.c.date)
+
+        results = (
             self.db.query(
                 date_expr.label("period"),
-                func.sum(case((Transaction.type == "income", Transaction.amount), else_=Decimal(0))).label("income"),
-                func.sum(case((Transaction.type == "expense", Transaction.amount), else_=Decimal(0))).label("expense"),
-                func.count(Transaction.id).label("count"),
-            )
-            .join(Account)
-            .filter(
-                Account.user_id == user_id,
-                Transaction.date >= date_from,
-                Transaction.date <= date_to,
+                func.sum(case((facts.c.type == "income", facts.c.amount), else_=Decimal(0))).label("income"),
+                func.sum(case((facts.c.type == "expense", facts.c.amount), else_=Decimal(0))).label("expense"),
+                func.sum(facts.c.count).label("count"),
             )
             .group_by(date_expr)
             .order_by(date_expr)
+            .all()
         )
 
-        if account_ids:
-            query = query.filter(Transaction.account_id.in_(account_ids))
-
-        results = query.all()
-
         stats = []
         for r in results:
             income = r.income or Decimal(0)
@@ -167,21 +198,17 @@ class AnalyticsService:
         date_from: date,
         date_to: date,
     ) -> List[AccountStats]:
+        facts = self._facts(user_id, date_from, date_to)
         results = (
             self.db.query(
                 Account.id,
                 Account.name,
                 Account.currency,
-                func.sum(case((Transaction.type == "income", Transaction.amount), else_=Decimal(0))).label("income"),
-                func.sum(case((Transaction.type == "expense", Transaction.amount), else_=Decimal(0))).label("expense"),
-                func.count(Transaction.id).label("count"),
-            )
-            .outerjoin(
-                Transaction,
-                (Transaction.account_id == Account.id) &
-                (Transaction.date >= date_from) &
-                (Transaction.date <= date_to)
+                func.sum(case((facts.c.type == "income", facts.c.amount), else_=Decimal(0))).label("income"),
+                func.sum(case((facts.c.type == "expense", facts.c.amount), else_=Decimal(0))).label("expense"),
+                func.sum(facts.c.count).label("count"),
             )
+            .outerjoin(facts, facts.c.account_id == Account.id)
             .filter(Account.user_id == user_id)
             .group_by(Account.id, Account.name, Account.currency)
             .all()
@@ -202,3 +229,171 @@ class AnalyticsService:
             ))
 
         return stats
+
+    def get_dashboard(
+        self,
+        user_id: UUID,
+        date_from: date,
+        date_to: date,
+        grouping: Grouping = "month",
+        account_ids: Optional[List[UUID]] = None,
+    ) -> DashboardResponse:
+        """
+        Summary, income and expense categories, periods and accounts in a
+        single scan: one GROUPING SETS query over the facts, one set per
+        breakdown (the summary is the sum of the periods).
+
+        account_ids narrows the summary, categories and periods only; the
+        account breakdown always covers all of the user's accounts, as
+        get_by_account does.
+        """
+        facts = self._facts(user_id, date_from, date_to)
+        date_expr, format_str = _period_expr(grouping, facts.c.date)
+
+        # Amount and count of the selected accounts' facts, NULL otherwise
+        amount = facts.c.amount
+        count = facts.c.count
+        if account_ids:
+            selected = facts.c.account_id.in_(account_ids)
+            amount = case((selected, amount))
+            count = case((selected, count))
+
+        results = (
+            self.db.query(
+                # Bit set for each breakdown column the row is NOT grouped by
+                func.grouping(Category.id, date_expr, Account.id).label("grouping_set"),
+                facts.c.type,
+                Category.id.label("category_id"),
+                Category.name.label("category_name"),
+                date_expr.label("period"),
+                Account.id.label("account_id"),
+                Account.name.label("account_name"),
+                Account.currency,
+                func.sum(amount).label("total"),
+                func.sum(count).label("count"),
+                func.sum(facts.c.amount).label("account_total"),
+                func.sum(facts.c.count).label("account_count"),
+            )
+            # Starting from the accounts keeps ones without activity
+            .select_from(Account)
+            .outerjoin(facts, facts.c.account_id == Account.id)
+            .outerjoin(Category, Category.id == facts.c.category_id)
+            .filter(Account.user_id == user_id)
+            .group_by(func.grouping_sets(
+                tuple_(Category.id, Category.name, facts.c.type),
+                tuple_(date_expr, facts.c.type),
+                tuple_(Account.id, Account.name, Account.currency, facts.c.type),
+            ))
+            .all()
+        )
+
+        by_category: Dict[str, list] = {"income": [], "expense": []}
+        periods: Dict[object, Dict[str, Decimal]] = {}
+        period_counts: Dict[object, int] = {}
+        accounts: Dict[UUID, dict] = {}
+
+        for r in results:
+            if r.grouping_set == 0b011:
+                # Uncategorized rows are left out, as in get_by_category;
+                # a NULL count means none of the selected accounts' facts
+                if r.category_id is not None and r.type in by_category and r.count is not None:
+                    by_category[r.type].append(r)
+            elif r.grouping_set == 0b101:
+                if r.type is not None and r.count is not None:
+                    periods.setdefault(r.period, {"income": Decimal(0), "expense": Decimal(0)})
+                    periods[r.period][r.type] = r.total or Decimal(0)
+                    period_counts[r.period] = period_counts.get(r.period, 0) + (r.count or 0)
+            elif r.grouping_set == 0b110:
+                account = accounts.setdefault(r.account_id, {
+                    "account_name": r.account_name,
+                    "currency": r.currency,
+                    "income": Decimal(0),
+                    "expense": Decimal(0),
+                    "count": 0,
+                })
+                if r.type is not None:
+                    account[r.type] = r.account_total or Decimal(0)
+                    account["count"] += r.account_count or 0
+
+        period_stats = []
+        for period in sorted(periods):
+            income = periods[period]["income"]
+            expense = periods[period]["expense"]
+            period_stats.append(PeriodStats(
+                period=period.strftime(format_str),
+                income=income,
+                expense=expense,
+                balance=income - expense,
+                transaction_count=period_counts[period],
+            ))
+
+        total_income = sum((p.income for p in period_stats), Decimal(0))
+        total_expense = sum((p.expense for p in period_stats), Decimal(0))
+
+        category_responses = {}
+        for transaction_type, rows in by_category.items():
+            categories = self._category_stats(rows)
+            category_responses[transaction_type] = AnalyticsByCategoryResponse(
+                date_from=date_from,
+                date_to=date_to,
+                type=transaction_type,
+                total=sum((c.total_amount for c in categories), Decimal(0)),
+                categories=categories,
+            )
+
+        return DashboardResponse(
+            date_from=date_from,
+            date_to=date_to,
+            summary=SummaryResponse(
+                total_income=total_income,
+                total_expense=total_expense,
+                balance=total_income - total_expense,
+                transaction_count=sum(p.transaction_count for p in period_stats),
+                date_from=date_from,
+                date_to=date_to,
+            ),
+            income_by_category=category_responses["income"],
+            expense_by_category=category_responses["expense"],
+            by_period=AnalyticsByPeriodResponse(
+                date_from=date_from,
+                date_to=date_to,
+                grouping=grouping,
+                periods=period_stats,
+            ),
+            by_account=AnalyticsByAccountResponse(
+                date_from=date_from,
+                date_to=date_to,
+                accounts=[
+                    AccountStats(
+                        account_id=account_id,
+                        account_name=a["account_name"],
+                        currency=a["currency"],
+                        total_income=a["income"],
+                        total_expense=a["expense"],
+                        balance=a["income"] - a["expense"],
+                        transaction_count=a["count"],
+                    )
+                    for account_id, a in accounts.items()
+                ],
+            ),
+        )
+
+    @staticmethod
+    def _category_stats(results) -> List[CategoryStats]:
+        # Calculate total for percentages
+        total = sum(r.total or Decimal(0) for r in results)
+
+        stats = []
+        for r in results:
+            amount = r.total or Decimal(0)
+            stats.append(CategoryStats(
+                category_id=r.category_id,
+                category_name=r.category_name or "Uncategorized",
+                total_amount=amount,
+                transaction_count=r.count or 0,
+                percentage=float(amount / total * 100) if total > 0 else 0,
+            ))
+
+        # Sort by amount descending
+        stats.sort(key=lambda x: x.total_amount, reverse=True)
+        return stats
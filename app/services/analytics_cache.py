@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.utils.cache import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_VERSION_KEY = "analytics:version:user:{user_id}"
+ANALYTICS_ENTRY_KEY = "analytics:entry:{user_id}:{endpoint}:{params_hash}"
+ANALYTICS_REFRESH_KEY = "analytics:refresh:{user_id}:{endpoint}:{params_hash}"
+
+# How long one process may own the background refresh of an entry
+REFRESH_LOCK_SECONDS = 30
+
+Compute = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class AnalyticsCache:
+    """
+    Redis cache of analytics responses.
+
+    Entries are keyed by (user, endpoint, normalised params) and stamped
+    with the user's data version, which every write that can change
+    analytics bumps (ingestion, transaction edits, recategorization,
+    account and category changes). An entry is served only while its
+    version is current, so closed periods stay cached until their data
+    changes. For periods that are still open, an entry from an older
+    version up to ANALYTICS_CACHE_STALE_SECONDS old is served while one
+    process recomputes it in the background. Redis failures fall back to
+    computing the response.
+    """
+
+    def __init__(self, ttl: int, stale_seconds: int):
+        self.ttl = ttl
+        self.stale_seconds = stale_seconds
+        self._refreshing: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.refreshes = 0
+
+    async def get_or_compute(
+        self,
+        user_id: UUID,
+        endpoint: str,
+        params: Dict[str, Any],
+        date_to: date,
+        compute: Compute,
+    ) -> Dict[str, Any]:
+        """
+        Cached response for an analytics call, computing it on a miss.
+        `compute` must not depend on the request (it may run after it).
+        """
+        if self.ttl <= 0:
+            return await compute()
+
+        params_hash = self._params_hash(params)
+        entry_key = ANALYTICS_ENTRY_KEY.format(user_id=user_id, endpoint=endpoint, params_hash=params_hash)
+        try:
+            # Read the version before computing, so a concurrent bump can
+            # only make the stored entry stale, never wrongly fresh
+            raw_version, raw_entry = await get_async_redis().mget(
+                ANALYTICS_VERSION_KEY.format(user_id=user_id),
+                entry_key,
+            )
+        except RedisError as e:
+            logger.warning("Analytics cache read failed: %s", e)
+            self.errors += 1
+            return await compute()
+
+        version = int(raw_version or 0)
+        entry = self._load(raw_entry, entry_key)
+        if entry is not None:
+            if entry["version"] == version:
+                self.hits += 1
+                return entry["data"]
+            if date_to >= date.today() and time.time() - entry["computed_at"] < self.stale_seconds:
+                self.stale_hits += 1
+                refresh_key = ANALYTICS_REFRESH_KEY.format(
+                    user_id=user_id, endpoint=endpoint, params_hash=params_hash
+                )
+                self._revalidate(entry_key, refresh_key, version, compute)
+                return entry["data"]
+
+        self.misses += 1
+        data = await compute()
+        await self._store(entry_key, version, data)
+        return data
+
+    def bump_user_version(self, user_id: UUID) -> None:
+        """Invalidate cached analytics of one user everywhere. Call after commit."""
+        try:
+            get_redis().incr(ANALYTICS_VERSION_KEY.format(user_id=user_id))
+        except RedisError as e:
+            # Entries of the old version keep being served until they
+            # expire (ANALYTICS_CACHE_TTL_SECONDS)
+            logger.warning("Analytics version bump failed for %s: %s", user_id, e)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "refreshes": self.refreshes,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _params_hash(params: Dict[str, Any]) -> str:
+        normalised = {}
+        for name, value in params.items():
+            if value is None or value == []:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                value = sorted({str(v) for v in value})
+            elif isinstance(value, date):
+                value = value.isoformat()
+            else:
+                value = str(value)
+            normalised[name] = value
+        raw = json.dumps(normalised, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _load(raw: Optional[bytes], entry_key: str) -> Optional[Dict[str, Any]]:
+        if raw is None:
+            return None
+        try:
+            entry = json.loads(raw)
+            if not isinstance(entry["version"], int) or "data" not in entry:
+                raise ValueError("malformed entry")
+            float(entry["computed_at"])
+            return entry
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Discarding corrupt analytics cache entry %s: %s", entry_key, e)
+            return None
+
+    async def _store(self, entry_key: str, version: int, data: Dict[str, Any]) -> None:
+        entry = {"version": version, "computed_at": time.time(), "data": data}
+        try:
+            await get_async_redis().set(
+                entry_key,
+                json.dumps(entry, separators=(",", ":")),
+                ex=self.ttl,
+            )
+        except RedisError as e:
+            logger.warning("Analytics cache write failed for %s: %s", entry_key, e)
+
+    def _revalidate(self, entry_key: str, refresh_key: str, version: int, compute: Compute) -> None:
+        task = asyncio.get_running_loop().create_task(
+            self._refresh(entry_key, refresh_key, version, compute)
+        )
+        # The loop only keeps weak references to tasks
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def _refresh(self, entry_key: str, refresh_key: str, version: int, compute: Compute) -> None:
+        redis_client = get_async_redis()
+        try:
+            # One refresh per entry across all processes
+            if not await redis_client.set(refresh_key, version, nx=True, ex=REFRESH_LOCK_SECONDS):
+                return
+            try:
+                data = await compute()
+                await self._store(entry_key, version, data)
+                self.refreshes += 1
+            finally:
+                await redis_client.delete(refresh_key)
+        except Exception as e:
+            logger.warning("Analytics cache refresh failed for %s: %s", entry_key, e)
+
+
+# Singleton instance
+analytics_cache = AnalyticsCache(
+    settings.ANALYTICS_CACHE_TTL_SECONDS,
+    settings.ANALYTICS_CACHE_STALE_SECONDS,
+)
@@ -1,13 +1,14 @@
 from typing import Optional
 from uuid import UUID
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.models import User
 from app.schemas import UserCreate, Token
+from app.services.user_cache import user_cache
 from app.utils.security import (
-    get_password_hash,
-    verify_password,
+    password_hasher,
     create_access_token,
     create_refresh_token,
     verify_token,
@@ -18,33 +19,40 @@ class AuthService:
     def __init__(self, db: Session):
         self.db = db
 
-    def register(self, user_data: UserCreate) -> User:
+    async def register(self, user_data: UserCreate) -> User:
         # Check if user already exists
-        existing_user = self.db.query(User).filter(
-            User.email == user_data.email
-        ).first()
+        existing_user = await run_in_threadpool(self._get_user_by_email, user_data.email)
         if existing_user:
             raise ValueError("User with this email already exists")
 
+        # Hash on the dedicated pool, not the shared one used for the DB
+        password_hash = await password_hasher.hash(user_data.password)
+
         # Create new user
         user = User(
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=password_hash,
             name=user_data.name,
         )
-        self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+        return await run_in_threadpool(self._save_user, user)
 
-    def authenticate(self, email: str, password: str) -> Optional[User]:
-        user = self.db.query(User).filter(User.email == email).first()
+    async def authenticate(self, email: str, password: str) -> Optional[User]:
+        user = await run_in_threadpool(self._get_user_by_email, email)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await password_hasher.verify(password, user.password_hash):
             return None
         return user
 
+    def _get_user_by_email(self, email: str) -> Optional[User]:
+        return self.db.query(User).filter(User.email == email).first()
+
+    def _save_user(self, user: User) -> User:
+        self.db.add(user)
+        self.db.commit()
+        self.db.refresh(user)
+        return user
+
     def create_tokens(self, user: User) -> Token:
         return Token(
             access_token=create_access_token(user.id),
@@ -65,11 +73,15 @@ class AuthService:
     def get_user_by_id(self, user_id: UUID) -> Optional[User]:
         return self.db.query(User).filter(User.id == user_id).first()
 
-    def update_user(self, user: User, name: Optional[str] = None, password: Optional[str] = None) -> User:
+    async def update_user(self, user: User, name: Optional[str] = None, password: Optional[str] = None) -> User:
         if name:
             user.name = name
         if password:
-            user.password_hash = get_password_hash(password)
+            user.password_hash = await password_hasher.hash(password)
+        return await run_in_threadpool(self._commit_user, user)
+
+    def _commit_user(self, user: User) -> User:
         self.db.commit()
+        user_cache.invalidate(user.id)
         self.db.refresh(user)
         return user
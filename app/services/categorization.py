@@ -1,15 +1,41 @@
 import re
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
 from uuid import UUID
 
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    column,
+    func,
+    literal,
+    or_,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
-from app.models import CategorizationRule, Category, Transaction
+from app.models import Account, CategorizationRule, Category, Transaction
+from app.services.analytics_cache import analytics_cache
+from app.services.rule_cache import rule_set_cache
+from app.services.rule_engine import CompiledRuleSet, RuleMatch
+
+RECATEGORIZE_BATCH_SIZE = 1000
+
+# Regex syntax that PostgreSQL either rejects or reads differently from
+# Python: inline groups/flags, \b (backspace in PG), \x/\u/\N/\p escapes,
+# numeric escapes, possessive quantifiers and {,n}.
+_NON_PORTABLE_REGEX = re.compile(r"\(\?(?!:)|\\[bBzGNpPuUx0-9]|[*+?}]\+|\{,")
 
 
 class CategorizationService:
     def __init__(self, db: Session):
         self.db = db
+        self._rule_sets: Dict[UUID, CompiledRuleSet] = {}
 
     def get_rules(self, user_id: UUID) -> List[CategorizationRule]:
         """Get all rules for user (user's + system rules)."""
@@ -22,10 +48,23 @@ class CategorizationService:
             .order_by(
                 CategorizationRule.user_id.desc().nullslast(),  # User rules first
                 CategorizationRule.priority.desc(),
+                CategorizationRule.created_at,
+                CategorizationRule.id,
             )
             .all()
         )
 
+    def get_rule_set(self, user_id: UUID) -> CompiledRuleSet:
+        """Get the compiled rule set for user (shared cache, then built)."""
+        rule_set = self._rule_sets.get(user_id)
+        if rule_set is None:
+            rule_set = rule_set_cache.get_or_build(
+                user_id,
+                lambda: CompiledRuleSet(self.get_rules(user_id)),
+            )
+            self._rule_sets[user_id] = rule_set
+        return rule_set
+
     def create_rule(
         self,
         user_id: UUID,
@@ -52,6 +91,10 @@ class CategorizationService:
         self.db.add(rule)
         self.db.commit()
         self.db.refresh(rule)
+        self._rule_sets.pop(user_id, None)
+        rule_set_cache.bump_user_version(user_id)
+
+        self.recategorize_for_rule(rule)
         return rule
 
     def delete_rule(self, rule_id: UUID, user_id: UUID) -> bool:
@@ -61,8 +104,25 @@ class CategorizationService:
         ).first()
         if not rule:
             return False
+
+        # Collect rows this rule categorized before the FK nulls the link
+        affected_ids = [
+            row.id for row in self.db.execute(
+                select(Transaction.id).where(Transaction.category_rule_id == rule.id)
+            )
+        ]
+
         self.db.delete(rule)
+        self.db.flush()
+        self._rule_sets.pop(user_id, None)
+
+        if affected_ids:
+            self._recategorize_removed_rule(user_id, affected_ids)
+
         self.db.commit()
+        rule_set_cache.bump_user_version(user_id)
+        if affected_ids:
+            analytics_cache.bump_user_version(user_id)
         return True
 
     def match_rule(self, rule: CategorizationRule, text: str) -> bool:
@@ -91,46 +151,363 @@ class CategorizationService:
         counterparty: Optional[str],
     ) -> Optional[UUID]:
         """Find matching category for transaction based on rules."""
-        rules = self.get_rules(user_id)
+        return self.get_rule_set(user_id).categorize(description, counterparty)
 
-        for rule in rules:
-            # Check description
-            if description and self.match_rule(rule, description):
-                return rule.category_id
-            # Check counterparty
-            if counterparty and self.match_rule(rule, counterparty):
-                return rule.category_id
+    def match_many(
+        self,
+        user_id: UUID,
+        rows: Iterable[Tuple[Optional[str], Optional[str]]],
+    ) -> List[Optional[RuleMatch]]:
+        """
+        Match a batch of (description, counterparty) pairs.
+        Rules are loaded and compiled once for the whole batch.
+        """
+        rule_set = self.get_rule_set(user_id)
+        return [
+            rule_set.match(description, counterparty)
+            for description, counterparty in rows
+        ]
 
-        return None
+    def categorize_many(
+        self,
+        user_id: UUID,
+        rows: Iterable[Tuple[Optional[str], Optional[str]]],
+    ) -> List[Optional[UUID]]:
+        """Categorize a batch of (description, counterparty) pairs."""
+        return [
+            match.category_id if match else None
+            for match in self.match_many(user_id, rows)
+        ]
 
     def recategorize_transactions(
         self,
         user_id: UUID,
         transaction_ids: Optional[List[UUID]] = None,
     ) -> int:
-        """Recategorize transactions based on current rules."""
-        query = self.db.query(Transaction).join(Transaction.account).filter(
-            Transaction.account.has(user_id=user_id),
-            Transaction.is_edited == False,  # Only auto-categorize non-edited
-        )
+        """
+        Recategorize transactions based on current rules.
 
+        On PostgreSQL the matching runs inside the database as one
+        set-based UPDATE; elsewhere rows are streamed through the compiled
+        rule set. No ORM objects are loaded either way.
+        """
+        filters = self._recategorize_filters(user_id)
         if transaction_ids:
-            query = query.filter(Transaction.id.in_(transaction_ids))
+            filters.append(Transaction.id.in_(transaction_ids))
 
-        transactions = query.all()
-        updated_count = 0
+        updated_count = self._recategorize(user_id, filters)
+        if updated_count > 0:
+            self.db.commit()
+            analytics_cache.bump_user_version(user_id)
+
+        return updated_count
+
+    def count_recategorizable(self, user_id: UUID) -> int:
+        """Number of transactions a full recategorization would consider."""
+        return self.db.execute(
+            select(func.count())
+            .select_from(Transaction)
+            .where(*self._recategorize_filters(user_id))
+        ).scalar_one()
+
+    def recategorize_chunk(
+        self,
+        user_id: UUID,
+        after_id: Optional[UUID],
+        limit: int,
+    ) -> Tuple[int, int, Optional[UUID]]:
+        """
+        Recategorize the next `limit` transactions in id order after `after_id`.
+        Does not commit, so the caller can commit the chunk with its checkpoint.
+        Returns (processed, updated, last id of the chunk).
+        """
+        filters = self._recategorize_filters(user_id)
+        if after_id is not None:
+            filters.append(Transaction.id > after_id)
 
-        for transaction in transactions:
-            category_id = self.categorize_transaction(
-                user_id=user_id,
-                description=transaction.description,
-                counterparty=transaction.counterparty,
+        ids = self.db.execute(
+            select(Transaction.id)
+            .where(*filters)
+            .order_by(Transaction.id)
+            .limit(limit)
+        ).scalars().all()
+        if not ids:
+            return 0, 0, None
+
+        filters.append(Transaction.id <= ids[-1])
+        updated = self._recategorize(user_id, filters)
+        return len(ids), updated, ids[-1]
+
+    def recategorize_for_rule(self, rule: CategorizationRule) -> int:
+        """
+        Recategorize only the transactions a newly added rule matches.
+        Every other row keeps its current winner, so nothing else is read.
+        """
+        filters = self._recategorize_filters(rule.user_id)
+
+        clause = self._rule_clause(rule)
+        if clause is not None:
+            updated_count = self._recategorize(rule.user_id, filters + [clause])
+        elif rule.match_type == "regex" and self._compile_regex(rule.pattern) is None:
+            updated_count = 0  # Invalid regex never matches
+        else:
+            updated_count = self._recategorize_python(
+                self.get_rule_set(rule.user_id),
+                filters,
+                predicate=lambda text: self.match_rule(rule, text),
             )
-            if category_id and category_id != transaction.category_id:
-                transaction.category_id = category_id
-                updated_count += 1
 
         if updated_count > 0:
             self.db.commit()
+            analytics_cache.bump_user_version(rule.user_id)
 
         return updated_count
+
+    def _recategorize_removed_rule(self, user_id: UUID, transaction_ids: List[UUID]) -> int:
+        """
+        Re-match rows a deleted rule had categorized.
+        Their category is cleared first, so rows no other rule claims end
+        up uncategorized instead of keeping the removed rule's category.
+        """
+        filters = self._recategorize_filters(user_id)
+        filters.append(Transaction.id.in_(transaction_ids))
+
+        self.db.execute(
+            update(Transaction)
+            .where(*filters)
+            .values(category_id=None, category_rule_id=None),
+            execution_options={"synchronize_session": False},
+        )
+        # The shared cache still holds the deleted rule until commit
+        rule_set = CompiledRuleSet(self.get_rules(user_id))
+        self._recategorize(user_id, filters, rule_set)
+        return len(transaction_ids)
+
+    def _is_postgresql(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def _recategorize_filters(self, user_id: UUID) -> List[ColumnElement[bool]]:
+        return [
+            Transaction.account_id.in_(
+                select(Account.id).where(Account.user_id == user_id)
+            ),
+            Transaction.is_edited == False,  # Only auto-categorize non-edited
+        ]
+
+    def _recategorize(
+        self,
+        user_id: UUID,
+        filters: List[ColumnElement[bool]],
+        rule_set: Optional[CompiledRuleSet] = None,
+    ) -> int:
+        if self._is_postgresql():
+            return self._recategorize_sql(user_id, filters, rule_set)
+        return self._recategorize_python(rule_set or self.get_rule_set(user_id), filters)
+
+    def _rule_clause(self, rule: CategorizationRule) -> Optional[ColumnElement[bool]]:
+        """
+        SQL predicate for rows a single rule matches.
+        Returns None when the rule has to be evaluated in Python.
+        """
+        if not self._is_postgresql():
+            return None
+
+        if rule.match_type == "exact":
+            pattern = rule.pattern.lower()
+            on_text = lambda col: func.lower(col) == pattern
+        elif rule.match_type == "contains":
+            escaped = re.sub(r"([\\%_])", r"\\\1", rule.pattern)
+            on_text = lambda col: col.ilike(f"%{escaped}%", escape="\\")
+        elif rule.match_type == "regex":
+            if self._compile_regex(rule.pattern) is None or not self._is_sql_regex(rule.pattern):
+                return None
+            on_text = lambda col: col.op("~*")(rule.pattern)
+        else:
+            return None
+
+        return or_(
+            and_(Transaction.description != "", on_text(Transaction.description)),
+            and_(Transaction.counterparty != "", on_text(Transaction.counterparty)),
+        )
+
+    def _recategorize_python(
+        self,
+        rule_set: CompiledRuleSet,
+        filters: List[ColumnElement[bool]],
+        predicate: Optional[Callable[[Optional[str]], bool]] = None,
+    ) -> int:
+        """
+        Stream (id, date, description, counterparty) tuples and update changed rows.
+        If predicate is given, only rows where it accepts either text are re-matched.
+        """
+        rows = self.db.execute(
+            select(
+                Transaction.id,
+                Transaction.date,
+                Transaction.description,
+                Transaction.counterparty,
+                Transaction.category_id,
+                Transaction.category_rule_id,
+            )
+            .where(*filters)
+            .execution_options(yield_per=RECATEGORIZE_BATCH_SIZE)
+        )
+
+        updates = []
+        for row in rows:
+            if predicate is not None and not (
+                predicate(row.description) or predicate(row.counterparty)
+            ):
+                continue
+            match = rule_set.match(row.description, row.counterparty)
+            if match and (
+                match.category_id != row.category_id
+                or match.rule_id != row.category_rule_id
+            ):
+                # The primary key is (id, date) since partitioning
+                updates.append({
+                    "id": row.id,
+                    "date": row.date,
+                    "category_id": match.category_id,
+                    "category_rule_id": match.rule_id,
+                })
+
+        for i in range(0, len(updates), RECATEGORIZE_BATCH_SIZE):
+            self.db.execute(update(Transaction), updates[i:i + RECATEGORIZE_BATCH_SIZE])
+
+        return len(updates)
+
+    def _recategorize_sql(
+        self,
+        user_id: UUID,
+        filters: List[ColumnElement[bool]],
+        rule_set: Optional[CompiledRuleSet] = None,
+    ) -> int:
+        """
+        Push rule matching down into PostgreSQL.
+
+        exact/contains rules and portable regexes become a VALUES list
+        joined against transactions; DISTINCT ON keeps the first matching
+        rule per row. Rows matched by a regex PostgreSQL cannot evaluate
+        are categorized in Python first and excluded from the UPDATE.
+        """
+        sql_rules = []
+        python_regexes = []
+        for order, rule in enumerate(self.get_rules(user_id)):
+            if rule.match_type in ("exact", "contains"):
+                sql_rules.append(
+                    (order, rule.match_type, rule.pattern.lower(), rule.id, rule.category_id)
+                )
+            elif rule.match_type == "regex":
+                compiled = self._compile_regex(rule.pattern)
+                if compiled is None:
+                    continue  # Never matches, same as match_rule
+                if self._is_sql_regex(rule.pattern):
+                    sql_rules.append(
+                        (order, rule.match_type, rule.pattern, rule.id, rule.category_id)
+                    )
+                else:
+                    python_regexes.append(compiled)
+
+        updated_count = 0
+
+        if python_regexes:
+            rows = self.db.execute(
+                select(Transaction.id, Transaction.description, Transaction.counterparty)
+                .where(*filters)
+                .execution_options(yield_per=RECATEGORIZE_BATCH_SIZE)
+            )
+            handled_ids = [
+                row.id for row in rows
+                if any(
+                    text and regex.search(text)
+                    for regex in python_regexes
+                    for text in (row.description, row.counterparty)
+                )
+            ]
+            if handled_ids:
+                updated_count += self._recategorize_python(
+                    rule_set or self.get_rule_set(user_id),
+                    filters + [Transaction.id.in_(handled_ids)],
+                )
+                filters = filters + [Transaction.id.not_in(handled_ids)]
+
+        if not sql_rules:
+            return updated_count
+
+        rules_table = values(
+            column("ord", Integer),
+            column("match_type", String),
+            column("pattern", String),
+            column("rule_id", PG_UUID(as_uuid=True)),
+            column("category_id", PG_UUID(as_uuid=True)),
+            name="rules",
+        ).data(sql_rules)
+
+        def matches(text_col: ColumnElement[str]) -> ColumnElement[bool]:
+            return and_(
+                text_col != "",
+                or_(
+                    and_(
+                        rules_table.c.match_type == "exact",
+                        func.lower(text_col) == rules_table.c.pattern,
+                    ),
+                    and_(
+                        rules_table.c.match_type == "contains",
+                        func.strpos(func.lower(text_col), rules_table.c.pattern) > 0,
+                    ),
+                    and_(
+                        rules_table.c.match_type == "regex",
+                        text_col.op("~*")(rules_table.c.pattern),
+                    ),
+                ),
+            )
+
+        winners = (
+            select(Transaction.id, Transaction.date, rules_table.c.rule_id, rules_table.c.category_id)
+            .join(
+                rules_table,
+                or_(matches(Transaction.description), matches(Transaction.counterparty)),
+            )
+            .where(*filters)
+            .distinct(Transaction.id, Transaction.date)
+            .order_by(Transaction.id, Transaction.date, rules_table.c.ord)
+            .subquery("winners")
+        )
+
+        result = self.db.execute(
+            update(Transaction)
+            .where(
+                Transaction.id == winners.c.id,
+                Transaction.date == winners.c.date,
+                or_(
+                    Transaction.category_id.is_distinct_from(winners.c.category_id),
+                    Transaction.category_rule_id.is_distinct_from(winners.c.rule_id),
+                ),
+            )
+            .values(
+                category_id=winners.c.category_id,
+                category_rule_id=winners.c.rule_id,
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        updated_count += result.rowcount
+
+        return updated_count
+
+    def _compile_regex(self, pattern: str) -> Optional[Pattern]:
+        try:
+            return re.compile(pattern, re.IGNORECASE)
+        except re.error:
+            return None
+
+    def _is_sql_regex(self, pattern: str) -> bool:
+        """Check that PostgreSQL evaluates pattern like Python's re does."""
+        if _NON_PORTABLE_REGEX.search(pattern):
+            return False
+        try:
+            with self.db.begin_nested():
+                self.db.execute(select(literal("").op("~*")(pattern)))
+        except DBAPIError:
+            return False
+        return True
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import time
+import uuid
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split an iterable into lists of at most `size` items."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def normalize_description(description: Optional[str]) -> str:
+    """Lowercase and collapse whitespace for fingerprinting."""
+    return " ".join((description or "").lower().split())
+
+
+def fingerprint_key(
+    tx_date: date,
+    amount: Decimal,
+    tx_type: str,
+    description: Optional[str],
+) -> Tuple[str, str, str, str]:
+    """
+    Normalized identity fields of a statement row. The amount is rounded
+    the way the Numeric(15, 2) column stores it.
+    """
+    return (
+        tx_date.isoformat(),
+        str(Decimal(amount).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+        tx_type,
+        normalize_description(description),
+    )
+
+
+def transaction_fingerprint(
+    account_id: uuid.UUID,
+    key: Tuple[str, str, str, str],
+    ordinal: int = 0,
+) -> uuid.UUID:
+    """
+    Deterministic identity of an imported statement row.
+
+    `ordinal` numbers rows with the same key within one statement, so
+    genuine repeats (two equal payments on the same day) are kept while
+    the same rows in an overlapping statement collide.
+    """
+    raw = "|".join([str(account_id), *key, str(ordinal)])
+    return uuid.UUID(bytes=hashlib.sha256(raw.encode("utf-8")).digest()[:16])
+
+
+class IngestionService:
+    """
+    Set-based writer for parsed statement rows.
+
+    Rows are inserted with one multi-row INSERT per batch instead of
+    going through the ORM unit of work object by object. Rows whose
+    fingerprint already exists are skipped by the unique index
+    (ON CONFLICT DO NOTHING), so re-imported statements add nothing.
+    No partition DDL runs here: rows of a month without a partition go
+    to transactions_default (see TransactionPartitionService).
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+
+    def insert_transactions(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Insert transaction rows in chunks of `batch_size`.
+        Rows may be a generator; at most one batch is held in memory.
+        Does not commit; the caller owns the transaction.
+        Returns new and skipped row counts, elapsed time and throughput.
+        """
+        started = time.perf_counter()
+        inserted = 0
+        skipped = 0
+
+        for batch in batched(rows, self.batch_size):
+            new_rows = self._insert_batch(batch)
+            inserted += new_rows
+            skipped += len(batch) - new_rows
+
+        elapsed = time.perf_counter() - started
+        total = inserted + skipped
+        rows_per_sec = total / elapsed if elapsed > 0 else float(total)
+        logger.info(
+            "Inserted %d transactions, skipped %d duplicates in %.3fs (%.0f rows/sec)",
+            inserted, skipped, elapsed, rows_per_sec,
+        )
+
+        return {
+            "rows": inserted,
+            "skipped": skipped,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows_per_sec, 1),
+        }
+
+    def _insert_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert one batch; returns how many rows were actually new."""
+        # executemany through the insertmanyvalues fast path; RETURNING
+        # only yields rows that did not hit the fingerprint index
+        stmt = (
+            insert(Transaction)
+            .on_conflict_do_nothing(index_elements=[Transaction.fingerprint, Transaction.date])
+            .returning(Transaction.id)
+        )
+        return len(self.db.execute(stmt, batch).all())
@@ -0,0 +1,128 @@
+import gzip
+import json
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional
+
+from app.config import settings
+from app.parsers.base import ParsedTransaction
+from app.utils.storage import ObjectNotFoundError, storage
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_PREFIX = "parse-cache"
+
+
+class ParseCache:
+    """
+    Parsed statements stored in object storage as gzipped JSON.
+
+    Objects are keyed by (content hash, parser type, parser version), so
+    re-uploading an identical file skips parsing, and bumping a parser's
+    `version` makes its old entries unreachable. The cache is best effort:
+    any read or write failure is logged and treated as a miss.
+    """
+
+    def object_name(self, content_hash: str, parser_type: str, version: int) -> str:
+        return f"{PARSE_CACHE_PREFIX}/{parser_type}/v{version}/{content_hash}.json.gz"
+
+    def get(
+        self,
+        content_hash: str,
+        parser_type: str,
+        version: int,
+    ) -> Optional[List[ParsedTransaction]]:
+        """Cached transactions for a file, or None on a miss."""
+        object_name = self.object_name(content_hash, parser_type, version)
+        try:
+            blob = storage.download_file(object_name)
+        except ObjectNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Parse cache read failed for %s: %s", object_name, e)
+            return None
+
+        try:
+            return [self._load_row(row) for row in json.loads(gzip.decompress(blob))]
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Discarding corrupt parse cache entry %s: %s", object_name, e)
+            return None
+
+    def set(
+        self,
+        content_hash: str,
+        parser_type: str,
+        version: int,
+        transactions: List[ParsedTransaction],
+    ) -> None:
+        """Store parsed transactions for a file."""
+        object_name = self.object_name(content_hash, parser_type, version)
+        rows = [self._dump_row(tx) for tx in transactions]
+        blob = gzip.compress(
+            json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        try:
+            storage.put_bytes(object_name, blob, content_type="application/gzip")
+        except Exception as e:
+            logger.warning("Parse cache write failed for %s: %s", object_name, e)
+
+    def record(self, transactions: Iterable[ParsedTransaction]) -> "ParseRecorder":
+        """Wrap a parse stream so its rows can be stored once it is consumed."""
+        return ParseRecorder(transactions, settings.PARSE_CACHE_MAX_ROWS)
+
+    @staticmethod
+    def _dump_row(tx: ParsedTransaction) -> list:
+        # Positional rows keep the blob compact
+        return [
+            str(tx["amount"]),
+            tx["type"],
+            tx["date"].isoformat(),
+            tx.get("description"),
+            tx.get("counterparty"),
+        ]
+
+    @staticmethod
+    def _load_row(row: list) -> ParsedTransaction:
+        amount, tx_type, tx_date, description, counterparty = row
+        return ParsedTransaction(
+            amount=Decimal(amount),
+            type=tx_type,
+            date=date.fromisoformat(tx_date),
+            description=description,
+            counterparty=counterparty,
+        )
+
+
+class ParseRecorder:
+    """
+    Pass-through iterator over parsed transactions that keeps a copy.
+    Stops keeping rows past `max_rows`, so very large statements are
+    streamed as usual and simply not cached.
+    """
+
+    def __init__(self, transactions: Iterable[ParsedTransaction], max_rows: int):
+        self._transactions = transactions
+        self._max_rows = max_rows
+        self.rows: List[ParsedTransaction] = []
+        self.complete = False
+        self.overflowed = False
+
+    def __iter__(self) -> Iterator[ParsedTransaction]:
+        for tx in self._transactions:
+            if not self.overflowed:
+                if len(self.rows) < self._max_rows:
+                    self.rows.append(tx)
+                else:
+                    self.overflowed = True
+                    self.rows = []
+            yield tx
+        self.complete = True
+
+    @property
+    def cacheable(self) -> bool:
+        return self.complete and not self.overflowed
+
+
+# Singleton instance
+parse_cache = ParseCache()
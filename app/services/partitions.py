@@ -0,0 +1,97 @@
+import logging
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Months this process has already seen a partition for
+_known_months: Set[date] = set()
+
+# Months whose partition could not be created, with the monotonic time
+# before which they are not retried
+_failed_months: Dict[date, float] = {}
+
+# Backoff after a failed partition creation
+RETRY_FAILED_AFTER_SECONDS = 600
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class TransactionPartitionService:
+    """
+    Monthly range partitions of transactions (migration 011).
+
+    Partitions are only created by ensure_transaction_partitions_task,
+    off-peak: it keeps them a few months ahead and drains the default
+    partition. Creating one moves rows out of transactions_default and
+    attaches it, which locks the default partition exclusively and the
+    tables the FKs reference, so writers (ingestion, manual entries) never
+    do it; rows of a month without a partition go to transactions_default
+    until the next run.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure_months(self, days: Iterable[date]) -> List[date]:
+        """
+        Create missing partitions for the months of `days`.
+
+        Each partition is created in its own short transaction on a
+        separate connection. Failures are logged and the month is skipped
+        for RETRY_FAILED_AFTER_SECONDS; its rows stay in the default
+        partition meanwhile. Returns created months.
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            return []
+
+        created = []
+        now = time.monotonic()
+        for month in sorted({month_start(day) for day in days} - _known_months):
+            if _failed_months.get(month, 0) > now:
+                continue
+            try:
+                with Session(bind=self.db.get_bind()) as session:
+                    # Never wait long behind a writer of the default partition
+                    session.execute(text("SET LOCAL lock_timeout = '2s'"))
+                    if session.scalar(select(func.ensure_transaction_partition(month))):
+                        created.append(month)
+                    session.commit()
+            except DBAPIError as e:
+                logger.warning("Could not create transactions partition for %s: %s", month, e)
+                _failed_months[month] = now + RETRY_FAILED_AFTER_SECONDS
+                continue
+            _failed_months.pop(month, None)
+            _known_months.add(month)
+
+        if created:
+            logger.info("Created transactions partitions for %s", ", ".join(m.isoformat() for m in created))
+        return created
+
+    def ensure_ahead(self, months_ahead: int) -> List[date]:
+        """Partitions from the current month to `months_ahead` months later."""
+        current = month_start(date.today())
+        return self.ensure_months(add_months(current, i) for i in range(months_ahead + 1))
+
+    def drain_default(self) -> List[date]:
+        """Create partitions for every month that has rows in the default partition."""
+        months = self.db.scalars(
+            text("SELECT DISTINCT date_trunc('month', date)::date FROM transactions_default")
+        ).all()
+        # Release the read lock, attaching a partition locks the default one
+        self.db.rollback()
+        # A month can be cached here if its partition was dropped since
+        _known_months.difference_update(months)
+        return self.ensure_months(months)
@@ -0,0 +1,57 @@
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Account, DailyAggregate, Transaction
+
+# Advisory lock namespace shared with the daily_aggregates_add() trigger
+# function (migration 010)
+ROLLUP_LOCK_NAMESPACE = "daily_aggregates"
+
+
+class RollupService:
+    """
+    Backfill of the daily_aggregates rollup for accounts created before it.
+
+    Writers keep the rollup current through triggers; this only rebuilds
+    an account's rows from scratch and flags it as ready for analytics.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def pending_accounts(self, limit: int) -> List[UUID]:
+        return list(self.db.scalars(
+            select(Account.id).where(Account.rollup_ready == False).limit(limit)
+        ))
+
+    def backfill_account(self, account_id: UUID) -> int:
+        """
+        Rebuild the rollup of one account and mark it ready. Commits.
+        Returns the number of rollup rows written.
+        """
+        # Exclusive per-account lock: waits for in-flight writers of the
+        # account to commit and holds new ones back until the rebuild is
+        # committed, so no delta is lost or counted twice
+        self.db.execute(select(func.pg_advisory_xact_lock(
+            func.hashtext(ROLLUP_LOCK_NAMESPACE),
+            func.hashtext(str(account_id)),
+        )))
+
+        self.db.execute(delete(DailyAggregate).where(DailyAggregate.account_id == account_id))
+        key = (Transaction.account_id, Transaction.date, Transaction.category_id, Transaction.type)
+        result = self.db.execute(
+            insert(DailyAggregate).from_select(
+                ["account_id", "date", "category_id", "type", "amount", "count"],
+                select(*key, func.sum(Transaction.amount), func.count())
+                .where(Transaction.account_id == account_id)
+                .group_by(*key),
+            )
+        )
+        self.db.execute(
+            update(Account).where(Account.id == account_id).values(rollup_ready=True)
+        )
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,83 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.services.rule_engine import CompiledRuleSet
+from app.utils.cache import LRUCache, get_redis
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_RULES_VERSION_KEY = "rules:version:system"
+USER_RULES_VERSION_KEY = "rules:version:user:{user_id}"
+
+
+class RuleSetCache:
+    """
+    Process-local LRU of compiled rule sets.
+
+    Entries are keyed by (user_id, system version, user version). The
+    versions live in Redis so every API process and Celery worker sees a
+    bump as soon as rules change; stale entries simply stop being hit and
+    age out of the LRU.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = LRUCache(maxsize)
+
+    def get_version(self, user_id: UUID) -> Optional[Tuple[int, int]]:
+        """Current (system, user) rules version, or None if Redis is down."""
+        try:
+            system_version, user_version = get_redis().mget(
+                SYSTEM_RULES_VERSION_KEY,
+                USER_RULES_VERSION_KEY.format(user_id=user_id),
+            )
+        except RedisError as e:
+            logger.warning("Rules version lookup failed: %s", e)
+            return None
+        return int(system_version or 0), int(user_version or 0)
+
+    def get_or_build(
+        self,
+        user_id: UUID,
+        build: Callable[[], CompiledRuleSet],
+    ) -> CompiledRuleSet:
+        """Return the cached rule set for user, building it on a miss."""
+        # Read the version before loading rules, so a concurrent bump
+        # can only make the stored entry stale, never wrongly fresh.
+        version = self.get_version(user_id)
+        if version is None:
+            return build()
+
+        key = (user_id, *version)
+        rule_set = self._cache.get(key)
+        if rule_set is None:
+            rule_set = build()
+            self._cache.set(key, rule_set)
+        return rule_set
+
+    def bump_user_version(self, user_id: UUID) -> None:
+        """Invalidate cached rule sets of one user everywhere."""
+        self._incr(USER_RULES_VERSION_KEY.format(user_id=user_id))
+
+    def bump_system_version(self) -> None:
+        """Invalidate all cached rule sets (system rules changed)."""
+        self._incr(SYSTEM_RULES_VERSION_KEY)
+
+    def _incr(self, key: str) -> None:
+        try:
+            get_redis().incr(key)
+        except RedisError as e:
+            # Without a shared version, peers may serve stale rules
+            # until Redis is back; drop what this process holds at least.
+            logger.warning("Rules version bump failed: %s", e)
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+# Singleton instance
+rule_set_cache = RuleSetCache(settings.RULE_CACHE_SIZE)
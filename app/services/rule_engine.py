@@ -0,0 +1,157 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+from uuid import UUID
+
+from app.models import CategorizationRule
+
+_NO_MATCH = float("inf")
+
+
+class RuleMatch(NamedTuple):
+    rule_id: UUID
+    category_id: UUID
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher.
+
+    Each pattern carries an integer value; `search` returns the smallest
+    value among all patterns found in the text in a single pass.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[float] = [_NO_MATCH]
+
+        for pattern, value in patterns:
+            node = 0
+            for ch in pattern:
+                next_node = self._goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(_NO_MATCH)
+                    self._goto[node][ch] = next_node
+                node = next_node
+            self._best[node] = min(self._best[node], value)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._best[node] = min(self._best[node], self._best[0])
+
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._best[child] = min(self._best[child], self._best[self._fail[child]])
+                queue.append(child)
+
+    def search(self, text: str) -> Optional[int]:
+        """Return the smallest value of any pattern contained in text."""
+        goto = self._goto
+        fail = self._fail
+        best_of = self._best
+
+        node = 0
+        best = best_of[0]
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best_of[node] < best:
+                best = best_of[node]
+
+        return None if best == _NO_MATCH else int(best)
+
+
+class CompiledRuleSet:
+    """
+    Categorization rules of one user compiled for fast matching.
+
+    Rules keep their evaluation order (user rules first, then by priority);
+    the first rule matching either the description or the counterparty wins,
+    exactly like `CategorizationService.match_rule` applied in order.
+    """
+
+    def __init__(self, rules: Sequence[CategorizationRule]):
+        self._matches: List[RuleMatch] = []
+        self._exact: Dict[str, int] = {}
+        self._regexes: List[Tuple[int, Pattern]] = []
+        contains: List[Tuple[str, int]] = []
+
+        for index, rule in enumerate(rules):
+            self._matches.append(RuleMatch(rule.id, rule.category_id))
+            pattern = rule.pattern or ""
+
+            if rule.match_type == "exact":
+                self._exact.setdefault(pattern.lower(), index)
+            elif rule.match_type == "contains":
+                contains.append((pattern.lower(), index))
+            elif rule.match_type == "regex":
+                try:
+                    self._regexes.append((index, re.compile(pattern, re.IGNORECASE)))
+                except re.error:
+                    continue
+
+        self._contains = AhoCorasick(contains)
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def match_index(self, text: Optional[str]) -> Optional[int]:
+        """Index of the first rule matching text, or None."""
+        if not text:
+            return None
+
+        text_lower = text.lower()
+        best = self._exact.get(text_lower)
+
+        found = self._contains.search(text_lower)
+        if found is not None and (best is None or found < best):
+            best = found
+
+        # Regexes are sorted by index, so stop once they cannot win
+        for index, regex in self._regexes:
+            if best is not None and index >= best:
+                break
+            if regex.search(text):
+                best = index
+                break
+
+        return best
+
+    def match(
+        self,
+        description: Optional[str],
+        counterparty: Optional[str],
+    ) -> Optional[RuleMatch]:
+        """Find the first rule matching description or counterparty."""
+        desc_index = self.match_index(description)
+        cp_index = self.match_index(counterparty)
+
+        if desc_index is None and cp_index is None:
+            return None
+        if desc_index is None:
+            return self._matches[cp_index]
+        if cp_index is None:
+            return self._matches[desc_index]
+        return self._matches[min(desc_index, cp_index)]
+
+    def categorize(
+        self,
+        description: Optional[str],
+        counterparty: Optional[str],
+    ) -> Optional[UUID]:
+        match = self.match(description, counterparty)
+        return match.category_id if match else None
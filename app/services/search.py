@@ -0,0 +1,172 @@
+import re
+from difflib import SequenceMatcher
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from sqlalchemy import func, literal, or_, select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import settings
+from app.models import Account, Transaction
+
+SearchMode = Literal["substring", "prefix", "fuzzy"]
+
+SEARCH_COLUMNS = (Transaction.description, Transaction.counterparty)
+
+
+def _like_pattern(term: str) -> str:
+    escaped = re.sub(r"([\\%_])", r"\\\1", term)
+    return f"%{escaped}%"
+
+
+def search_clause(term: str) -> ColumnElement[bool]:
+    """
+    Case-insensitive substring match on description or counterparty.
+    Served by the trigram GIN indexes on PostgreSQL (terms of 3+ chars).
+    """
+    pattern = _like_pattern(term)
+    return or_(*(col.ilike(pattern, escape="\\") for col in SEARCH_COLUMNS))
+
+
+class SearchService:
+    """
+    Ranked transaction search.
+
+    On PostgreSQL every mode is answered from the pg_trgm GIN indexes:
+    substring via ILIKE, prefix via a word-start regex and fuzzy via the
+    word similarity operator, so latency follows the number of matches
+    rather than the size of the history. Results are ranked by
+    word_similarity, newest first on ties. Other databases (tests) get
+    the same modes evaluated in Python.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(
+        self,
+        user_id: UUID,
+        query: str,
+        mode: SearchMode = "substring",
+        account_id: Optional[UUID] = None,
+        limit: int = 20,
+    ) -> List[Transaction]:
+        term = " ".join(query.split())
+        if not term:
+            return []
+
+        filters = [
+            Transaction.account_id.in_(
+                select(Account.id).where(Account.user_id == user_id)
+            ),
+        ]
+        if account_id:
+            filters.append(Transaction.account_id == account_id)
+
+        if self._is_postgresql():
+            return self._search_sql(term, mode, filters, limit)
+        return self._search_python(term, mode, filters, limit)
+
+    def _is_postgresql(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def _search_sql(
+        self,
+        term: str,
+        mode: SearchMode,
+        filters: List[ColumnElement[bool]],
+        limit: int,
+    ) -> List[Transaction]:
+        if mode == "fuzzy":
+            # <% compares against this threshold; scoped to the transaction
+            self.db.execute(
+                select(func.set_config(
+                    "pg_trgm.word_similarity_threshold",
+                    str(settings.SEARCH_FUZZY_THRESHOLD),
+                    True,
+                ))
+            )
+            on_text = lambda col: literal(term).op("<%")(col)
+        elif mode == "prefix":
+            on_text = lambda col: col.op("~*")(r"\m" + re.escape(term))
+        else:
+            pattern = _like_pattern(term)
+            on_text = lambda col: col.ilike(pattern, escape="\\")
+
+        rank = func.greatest(
+            *(func.word_similarity(term, func.coalesce(col, "")) for col in SEARCH_COLUMNS)
+        )
+        return (
+            self.db.query(Transaction)
+            .options(joinedload(Transaction.category))
+            .filter(*filters, or_(*(on_text(col) for col in SEARCH_COLUMNS)))
+            .order_by(
+                rank.desc(),
+                Transaction.date.desc(),
+                Transaction.created_at.desc(),
+                Transaction.id.desc(),
+            )
+            .limit(limit)
+            .all()
+        )
+
+    def _search_python(
+        self,
+        term: str,
+        mode: SearchMode,
+        filters: List[ColumnElement[bool]],
+        limit: int,
+    ) -> List[Transaction]:
+        term_lower = term.lower()
+        prefix = re.compile(r"(?<!\w)" + re.escape(term_lower))
+        scored = []
+
+        rows = self.db.execute(
+            select(Transaction.id, *SEARCH_COLUMNS, Transaction.date, Transaction.created_at)
+            .where(*filters)
+            .execution_options(yield_per=1000)
+        )
+        for tx_id, description, counterparty, tx_date, created_at in rows:
+            texts = [text.lower() for text in (description, counterparty) if text]
+            if mode == "fuzzy":
+                matched = any(
+                    _word_similarity(term_lower, text) >= settings.SEARCH_FUZZY_THRESHOLD
+                    for text in texts
+                )
+            elif mode == "prefix":
+                matched = any(prefix.search(text) for text in texts)
+            else:
+                matched = any(term_lower in text for text in texts)
+
+            if matched:
+                rank = max(_word_similarity(term_lower, text) for text in texts)
+                scored.append((rank, tx_date, created_at, tx_id))
+
+        scored.sort(reverse=True)
+        ids = [tx_id for *_, tx_id in scored[:limit]]
+        if not ids:
+            return []
+
+        by_id = {
+            tx.id: tx
+            for tx in self.db.query(Transaction)
+            .options(joinedload(Transaction.category))
+            .filter(Transaction.id.in_(ids))
+        }
+        return [by_id[tx_id] for tx_id in ids]
+
+
+def _word_similarity(term: str, text: str) -> float:
+    """
+    Rough stand-in for pg_trgm's word_similarity: best match of the term
+    against any run of as many words in the text.
+    """
+    words = text.split()
+    width = max(len(term.split()), 1)
+    if len(words) <= width:
+        return SequenceMatcher(None, term, text).ratio()
+    return max(
+        SequenceMatcher(None, term, " ".join(words[i:i + width])).ratio()
+        for i in range(len(words) - width + 1)
+    )
@@ -1,12 +1,23 @@
-from datetime import datetime
-from typing import BinaryIO, List, Optional
+from datetime import datetime, timedelta
+from typing import BinaryIO, List, Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models import Upload, Account
+from app.models import Upload, Account, Transaction
+from app.config import settings
+from app.services.analytics_cache import analytics_cache
 from app.utils.storage import storage
 
+ALLOWED_CONTENT_TYPES = [
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.ms-excel",
+    "text/csv",
+]
+
 
 class UploadService:
     def __init__(self, db: Session):
@@ -19,21 +30,22 @@ class UploadService:
         file: BinaryIO,
         filename: str,
         content_type: str,
+        max_size: Optional[int] = None,
     ) -> Upload:
-        # Verify account belongs to user
-        account = self.db.query(Account).filter(
-            Account.id == account_id,
-            Account.user_id == user_id,
-        ).first()
-        if not account:
-            raise ValueError("Account not found or access denied")
+        """
+        Stream a statement file to storage and record the upload.
+        Raises ValueError for a foreign account or a file over max_size.
+        """
+        self._check_account(user_id, account_id)
 
-        # Upload file to MinIO
-        file_path = storage.upload_file(
-            file=file,
+        # Stream file to MinIO; the content hash (used to reuse parse
+        # results for re-uploaded statements) is computed on the way
+        stored = storage.upload_stream(
+            stream=file,
             filename=filename,
             content_type=content_type,
             user_id=str(user_id),
+            max_size=max_size,
         )
 
         # Create upload record
@@ -41,7 +53,8 @@ class UploadService:
             user_id=user_id,
             account_id=account_id,
             filename=filename,
-            file_path=file_path,
+            file_path=stored.object_name,
+            content_hash=stored.content_hash,
             status="pending",
         )
         self.db.add(upload)
@@ -50,20 +63,147 @@ class UploadService:
 
         return upload
 
+    def initiate_upload(
+        self,
+        user_id: UUID,
+        account_id: UUID,
+        filename: str,
+        content_type: str,
+        size: int,
+    ) -> Tuple[Upload, str]:
+        """
+        Start a direct-to-storage upload.
+        Returns the upload record (status "uploading") and a presigned PUT URL.
+        """
+        self._check_account(user_id, account_id)
+
+        if content_type not in ALLOWED_CONTENT_TYPES:
+            raise ValueError("File type not supported. Allowed: PDF, Excel, CSV")
+        self._check_size(size)
+
+        # Sign first: backends without presigned URLs raise NotImplementedError
+        file_path = storage.new_object_name(filename, str(user_id))
+        upload_url = storage.get_upload_url(
+            file_path, expires_minutes=settings.UPLOAD_URL_EXPIRE_MINUTES
+        )
+
+        upload = Upload(
+            user_id=user_id,
+            account_id=account_id,
+            filename=filename,
+            file_path=file_path,
+            status="uploading",
+        )
+        self.db.add(upload)
+        self.db.commit()
+        self.db.refresh(upload)
+
+        return upload, upload_url
+
+    def complete_upload(self, upload_id: UUID, user_id: UUID) -> Optional[Upload]:
+        """
+        Verify a direct upload landed in storage and mark it pending.
+        Returns None if the upload does not exist; raises ValueError if it
+        is not awaiting completion or the stored object is invalid.
+        """
+        upload = self.get_upload(upload_id, user_id)
+        if not upload:
+            return None
+        if upload.status != "uploading":
+            raise ValueError("Upload is not awaiting completion")
+
+        info = storage.stat_file(upload.file_path)
+        if info is None:
+            raise ValueError("File has not been uploaded yet")
+
+        try:
+            if info.content_type not in ALLOWED_CONTENT_TYPES:
+                raise ValueError("File type not supported. Allowed: PDF, Excel, CSV")
+            self._check_size(info.size)
+        except ValueError as e:
+            storage.delete_file(upload.file_path)
+            upload.status = "error"
+            upload.error_message = str(e)
+            self.db.commit()
+            raise
+
+        # Conditional update, so concurrent completions enqueue only once
+        completed = self.db.query(Upload).filter(
+            Upload.id == upload.id,
+            Upload.status == "uploading",
+        ).update({"status": "pending"}, synchronize_session=False)
+        self.db.commit()
+        if not completed:
+            raise ValueError("Upload is not awaiting completion")
+
+        self.db.refresh(upload)
+        return upload
+
+    def _check_account(self, user_id: UUID, account_id: UUID) -> None:
+        # Verify account belongs to user
+        account = self.db.query(Account).filter(
+            Account.id == account_id,
+            Account.user_id == user_id,
+        ).first()
+        if not account:
+            raise ValueError("Account not found or access denied")
+
+    def _check_size(self, size: int) -> None:
+        if size > settings.MAX_UPLOAD_SIZE:
+            raise ValueError(
+                f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB"
+            )
+        if size <= 0:
+            raise ValueError("File is empty")
+
     def get_uploads(
         self,
         user_id: UUID,
         account_id: Optional[UUID] = None,
         status: Optional[str] = None,
+        page: int = 1,
+        size: int = 50,
     ) -> List[Upload]:
-        query = self.db.query(Upload).filter(Upload.user_id == user_id)
-
+        """
+        One page of uploads, newest first, with transaction_count filled in.
+        Counts not stored yet come from a grouped LEFT JOIN over just the
+        uncounted uploads of the page, in the same query.
+        """
+        filters = [Upload.user_id == user_id]
         if account_id:
-            query = query.filter(Upload.account_id == account_id)
+            filters.append(Upload.account_id == account_id)
         if status:
-            query = query.filter(Upload.status == status)
+            filters.append(Upload.status == status)
+
+        order = (Upload.uploaded_at.desc(), Upload.id.desc())
+        page_ids = (
+            select(Upload.id)
+            .where(*filters)
+            .order_by(*order)
+            .offset((page - 1) * size)
+            .limit(size)
+            .subquery()
+        )
+        counts = (
+            select(Transaction.upload_id, func.count().label("counted"))
+            .join(Upload, Upload.id == Transaction.upload_id)
+            .where(Upload.id.in_(select(page_ids.c.id)), Upload.transaction_count.is_(None))
+            .group_by(Transaction.upload_id)
+            .subquery()
+        )
+        rows = (
+            self.db.query(Upload, counts.c.counted)
+            .join(page_ids, page_ids.c.id == Upload.id)
+            .outerjoin(counts, counts.c.upload_id == Upload.id)
+            .order_by(*order)
+            .all()
+        )
 
-        return query.order_by(Upload.uploaded_at.desc()).all()
+        for upload, counted in rows:
+            if upload.transaction_count is None:
+                # Shown, not stored: the backfill task owns the write
+                set_committed_value(upload, "transaction_count", counted or 0)
+        return [upload for upload, _ in rows]
 
     def get_upload(self, upload_id: UUID, user_id: UUID) -> Optional[Upload]:
         return self.db.query(Upload).filter(
@@ -71,6 +211,79 @@ class UploadService:
             Upload.user_id == user_id,
         ).first()
 
+    def with_transaction_count(self, upload: Upload) -> Upload:
+        """Fill in transaction_count for an upload that was not counted yet."""
+        if upload.transaction_count is None:
+            set_committed_value(upload, "transaction_count", self.count_transactions(upload.id))
+        return upload
+
+    def count_transactions(self, upload_id: UUID) -> int:
+        return self.db.query(func.count(Transaction.id)).filter(
+            Transaction.upload_id == upload_id
+        ).scalar()
+
+    def refresh_transaction_count(self, upload: Upload) -> None:
+        """Recount and store an upload's transactions. Does not commit."""
+        upload.transaction_count = self.count_transactions(upload.id)
+
+    def adjust_transaction_count(self, upload_id: UUID, delta: int) -> None:
+        """Shift a stored count after transactions were added or removed."""
+        self.db.execute(
+            update(Upload)
+            .where(Upload.id == upload_id, Upload.transaction_count.isnot(None))
+            .values(transaction_count=Upload.transaction_count + delta)
+        )
+
+    def backfill_transaction_counts(self, limit: int) -> int:
+        """
+        Store counts for up to `limit` finished uploads that have none.
+        Uploads still being processed get theirs from the ingestion task.
+        Returns how many uploads were updated; commits.
+        """
+        batch = (
+            select(Upload.id)
+            .where(Upload.transaction_count.is_(None), Upload.status.in_(("done", "error")))
+            .limit(limit)
+        )
+        counted = (
+            select(func.count(Transaction.id))
+            .where(Transaction.upload_id == Upload.id)
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            update(Upload)
+            .where(Upload.id.in_(batch), Upload.transaction_count.is_(None))
+            .values(transaction_count=counted),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def expire_abandoned_uploads(self, limit: int) -> int:
+        """
+        Delete up to `limit` direct uploads that were initiated but never
+        completed within UPLOAD_ABANDONED_AFTER_MINUTES, with whatever
+        reached storage. Returns how many were deleted; commits.
+        """
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.UPLOAD_ABANDONED_AFTER_MINUTES)
+        batch = (
+            select(Upload.id)
+            .where(Upload.status == "uploading", Upload.uploaded_at < cutoff)
+            .limit(limit)
+        )
+        # Conditional on the status, so an upload completed meanwhile stays
+        file_paths = self.db.execute(
+            delete(Upload)
+            .where(Upload.id.in_(batch), Upload.status == "uploading")
+            .returning(Upload.file_path),
+            execution_options={"synchronize_session": False},
+        ).scalars().all()
+        self.db.commit()
+
+        for file_path in file_paths:
+            storage.delete_file(file_path)
+        return len(file_paths)
+
     def update_status(
         self,
         upload_id: UUID,
@@ -102,6 +315,7 @@ class UploadService:
         # Delete from database (cascades to transactions)
         self.db.delete(upload)
         self.db.commit()
+        analytics_cache.bump_user_version(user_id)
         return True
 
     def download_file(self, upload_id: UUID, user_id: UUID) -> Optional[bytes]:
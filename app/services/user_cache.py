@@ -0,0 +1,135 @@
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from app.config import settings
+from app.models import User
+from app.utils.cache import LRUCache, get_redis
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_KEY = "auth:user:{user_id}"
+
+# Columns kept for the authenticated user; the password hash is left out
+# so it never reaches Redis (it is loaded lazily if something reads it)
+CACHED_COLUMNS = ("id", "email", "name", "created_at")
+
+
+class UserCache:
+    """
+    Short-TTL cache of authenticated users, keyed by user id.
+
+    Entries are plain column snapshots held in a process-local LRU and,
+    when USER_CACHE_REDIS is on, in Redis so other API processes can skip
+    the lookup too. update_user invalidates both; peers that already hold
+    a local copy may serve it until its TTL runs out.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, use_redis: bool):
+        self._cache = LRUCache(maxsize)
+        self.ttl = ttl
+        self.use_redis = use_redis
+
+    def get(self, db: Session, user_id: UUID) -> Optional[User]:
+        """Cached user attached to `db` without a SELECT, or None on a miss."""
+        if self.ttl <= 0:
+            return None
+
+        entry = self._cache.get(user_id)
+        if entry is not None:
+            expires_at, snapshot = entry
+            if expires_at > time.monotonic():
+                return self._attach(db, snapshot)
+            self._cache.pop(user_id)
+
+        snapshot = self._redis_get(user_id)
+        if snapshot is None:
+            return None
+        self._cache.set(user_id, (time.monotonic() + self.ttl, snapshot))
+        return self._attach(db, snapshot)
+
+    def set(self, user: User) -> None:
+        """Cache a user freshly loaded from the database."""
+        if self.ttl <= 0:
+            return
+
+        snapshot = {column: getattr(user, column) for column in CACHED_COLUMNS}
+        self._cache.set(user.id, (time.monotonic() + self.ttl, snapshot))
+        self._redis_set(user.id, snapshot)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop a user after their row changed."""
+        self._cache.pop(user_id)
+        if not self.use_redis:
+            return
+        try:
+            get_redis().delete(USER_CACHE_KEY.format(user_id=user_id))
+        except RedisError as e:
+            logger.warning("User cache invalidation failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    @staticmethod
+    def _attach(db: Session, snapshot: Dict[str, Any]) -> User:
+        # A detached copy merged with load=False joins the session as a
+        # persistent object without touching the database
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def _redis_get(self, user_id: UUID) -> Optional[Dict[str, Any]]:
+        if not self.use_redis:
+            return None
+        try:
+            raw = get_redis().get(USER_CACHE_KEY.format(user_id=user_id))
+        except RedisError as e:
+            logger.warning("User cache read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+
+        try:
+            data = json.loads(raw)
+            return {
+                "id": UUID(data["id"]),
+                "email": data["email"],
+                "name": data["name"],
+                "created_at": datetime.fromisoformat(data["created_at"]),
+            }
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Discarding corrupt user cache entry for %s: %s", user_id, e)
+            return None
+
+    def _redis_set(self, user_id: UUID, snapshot: Dict[str, Any]) -> None:
+        if not self.use_redis:
+            return
+        data = {
+            "id": str(snapshot["id"]),
+            "email": snapshot["email"],
+            "name": snapshot["name"],
+            "created_at": snapshot["created_at"].isoformat(),
+        }
+        try:
+            get_redis().set(
+                USER_CACHE_KEY.format(user_id=user_id),
+                json.dumps(data),
+                ex=self.ttl,
+            )
+        except RedisError as e:
+            logger.warning("User cache write failed: %s", e)
+
+
+# Singleton instance
+user_cache = UserCache(
+    settings.USER_CACHE_SIZE,
+    settings.USER_CACHE_TTL_SECONDS,
+    settings.USER_CACHE_REDIS,
+)
@@ -1,6 +1,9 @@
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_init
 
 from app.config import settings
+from app.utils.storage import init_storage
 
 celery_app = Celery(
     "pfm",
@@ -17,7 +20,29 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=600,
     worker_prefetch_multiplier=1,
+    beat_schedule={
+        "ensure-transaction-partitions": {
+            "task": "app.tasks.partitions.ensure_transaction_partitions_task",
+            "schedule": crontab(hour=3, minute=0),
+        },
+        "expire-abandoned-uploads": {
+            "task": "app.tasks.upload_cleanup.expire_abandoned_uploads_task",
+            "schedule": crontab(minute="*/15"),
+        },
+    },
 )
 
+
+@worker_process_init.connect
+def _init_worker_storage(**kwargs) -> None:
+    # Check the bucket once per worker process instead of at import
+    init_storage()
+
+
 # ВАЖНО: Явный импорт задачи ПОСЛЕ создания celery_app
-from app.tasks.process_upload import process_upload_task  # noqa: F401
\ No newline at end of file
+from app.tasks.process_upload import process_upload_task  # noqa: F401
+from app.tasks.recategorize import recategorize_task  # noqa: F401
+from app.tasks.upload_counts import backfill_upload_counts_task  # noqa: F401
+from app.tasks.upload_cleanup import expire_abandoned_uploads_task  # noqa: F401
+from app.tasks.rollup import backfill_daily_aggregates_task  # noqa: F401
+from app.tasks.partitions import ensure_transaction_partitions_task  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,23 @@
+from typing import Any, Dict
+
+from app.config import settings
+from app.tasks import celery_app
+from app.database import SessionLocal
+from app.services.partitions import TransactionPartitionService
+
+
+@celery_app.task
+def ensure_transaction_partitions_task() -> Dict[str, Any]:
+    """
+    Keep monthly transactions partitions TRANSACTION_PARTITION_MONTHS_AHEAD
+    months ahead, and give months that ended up in the default partition
+    their own. Scheduled daily by celery beat.
+    """
+    db = SessionLocal()
+    try:
+        service = TransactionPartitionService(db)
+        created = service.drain_default()
+        created += service.ensure_ahead(settings.TRANSACTION_PARTITION_MONTHS_AHEAD)
+        return {"partitions_created": [month.isoformat() for month in created]}
+    finally:
+        db.close()
@@ -1,13 +1,21 @@
+from collections import Counter
+from contextlib import ExitStack
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterable, Iterator
 from uuid import UUID
 
+from app.config import settings
 from app.tasks import celery_app
 from app.database import SessionLocal
-from app.models import Upload, Account, Bank, Transaction
+from app.models import Upload, Account, Bank
 from app.parsers import get_parser
+from app.parsers.base import ParsedTransaction
+from app.services.analytics_cache import analytics_cache
 from app.services.categorization import CategorizationService
-from app.utils.storage import storage
+from app.services.ingestion import IngestionService, batched, fingerprint_key, transaction_fingerprint
+from app.services.parse_cache import parse_cache
+from app.services.upload import UploadService
+from app.utils.storage import sha256_file, storage
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -15,15 +23,19 @@ def process_upload_task(self, upload_id: str) -> Dict[str, Any]:
     """
     Process an uploaded bank statement file.
 
-    1. Download file from MinIO
-    2. Determine parser based on bank.parser_type
-    3. Parse file to extract transactions
-    4. Apply categorization rules
-    5. Save transactions to database
-    6. Update upload status
+    1. Determine parser based on bank.parser_type
+    2. Reuse cached parse results for identical files (hashing files
+       uploaded directly to storage first), otherwise stream the file
+       from MinIO to a temp file and parse it from disk
+    3. Apply categorization rules per batch
+    4. Bulk insert transactions per batch, skipping rows already
+       imported from an overlapping statement
+    5. Update upload status
     """
     db = SessionLocal()
     upload_uuid = UUID(upload_id)
+    # Owns the downloaded temp file for as long as parsing is lazy
+    downloads = ExitStack()
 
     try:
         # Get upload record
@@ -44,56 +56,60 @@ def process_upload_task(self, upload_id: str) -> Dict[str, Any]:
         if not bank:
             raise ValueError("Bank not found")
 
-        # Download file from MinIO
-        file_content = storage.download_file(upload.file_path)
-
         # Get appropriate parser
         parser = get_parser(bank.parser_type)
         if not parser:
             raise ValueError(f"No parser available for bank type: {bank.parser_type}")
 
-        # Parse the file
-        parsed_transactions = parser.parse(file_content, upload.filename)
+        file_path = None
+        if upload.content_hash is None:
+            # Direct (presigned) uploads are hashed here, after download
+            file_path = downloads.enter_context(storage.download_to_temp(upload.file_path))
+            upload.content_hash = sha256_file(file_path)
+            # Committed now: an open write on uploads during ingestion would
+            # hold back ensure_transaction_partitions_task (the FKs lock it)
+            db.commit()
 
-        # Initialize categorization service
-        categorization_service = CategorizationService(db)
+        use_cache = settings.PARSE_CACHE_ENABLED
+        cached = None
+        if use_cache:
+            cached = parse_cache.get(upload.content_hash, bank.parser_type, parser.version)
 
-        # Create transaction records
-        transactions_created = 0
-        for tx_data in parsed_transactions:
-            # Try to categorize
-            category_id = categorization_service.categorize_transaction(
-                user_id=upload.user_id,
-                description=tx_data.get("description"),
-                counterparty=tx_data.get("counterparty"),
-            )
+        recorder = None
+        if cached is not None:
+            parsed_transactions = cached
+        else:
+            # Download file from MinIO to disk and parse lazily from there
+            if file_path is None:
+                file_path = downloads.enter_context(storage.download_to_temp(upload.file_path))
+            parsed_transactions = parser.iter_parse(file_path, upload.filename)
+            if use_cache:
+                parsed_transactions = recorder = parse_cache.record(parsed_transactions)
 
-            transaction = Transaction(
-                account_id=upload.account_id,
-                upload_id=upload.id,
-                category_id=category_id,
-                amount=tx_data["amount"],
-                type=tx_data["type"],
-                date=tx_data["date"],
-                description=tx_data.get("description"),
-                counterparty=tx_data.get("counterparty"),
-                original_amount=tx_data["amount"],
-                original_description=tx_data.get("description"),
-                original_counterparty=tx_data.get("counterparty"),
-                is_edited=False,
-            )
-            db.add(transaction)
-            transactions_created += 1
+        # Rows are categorized and inserted batch by batch
+        rows = _transaction_rows(upload, parsed_transactions, CategorizationService(db))
+
+        # Bulk insert transactions
+        ingest_stats = IngestionService(db).insert_transactions(rows)
+
+        if recorder is not None and recorder.cacheable:
+            parse_cache.set(upload.content_hash, bank.parser_type, parser.version, recorder.rows)
 
         # Update upload status
+        UploadService(db).refresh_transaction_count(upload)
         upload.status = "done"
         upload.processed_at = datetime.utcnow()
         db.commit()
+        analytics_cache.bump_user_version(upload.user_id)
 
         return {
             "upload_id": upload_id,
             "status": "done",
-            "transactions_created": transactions_created,
+            "parse_cache_hit": cached is not None,
+            "transactions_created": ingest_stats["rows"],
+            "transactions_skipped": ingest_stats["skipped"],
+            "ingest_seconds": ingest_stats["seconds"],
+            "ingest_rows_per_sec": ingest_stats["rows_per_sec"],
         }
 
     except Exception as e:
@@ -117,4 +133,48 @@ def process_upload_task(self, upload_id: str) -> Dict[str, Any]:
         }
 
     finally:
+        downloads.close()
         db.close()
+
+
+def _transaction_rows(
+    upload: Upload,
+    parsed_transactions: Iterable[ParsedTransaction],
+    categorization_service: CategorizationService,
+) -> Iterator[Dict[str, Any]]:
+    """Categorize parsed transactions in bounded batches and yield insert rows."""
+    # Occurrences of identical rows so far, for the fingerprint ordinal
+    occurrences: Counter = Counter()
+
+    for batch in batched(parsed_transactions, settings.INGEST_BATCH_SIZE):
+        matches = categorization_service.match_many(
+            upload.user_id,
+            ((tx_data.get("description"), tx_data.get("counterparty")) for tx_data in batch),
+        )
+
+        for tx_data, match in zip(batch, matches):
+            key = fingerprint_key(
+                tx_data["date"],
+                tx_data["amount"],
+                tx_data["type"],
+                tx_data.get("description"),
+            )
+            ordinal = occurrences[key]
+            occurrences[key] += 1
+
+            yield {
+                "account_id": upload.account_id,
+                "upload_id": upload.id,
+                "category_id": match.category_id if match else None,
+                "category_rule_id": match.rule_id if match else None,
+                "amount": tx_data["amount"],
+                "type": tx_data["type"],
+                "date": tx_data["date"],
+                "description": tx_data.get("description"),
+                "counterparty": tx_data.get("counterparty"),
+                "original_amount": tx_data["amount"],
+                "original_description": tx_data.get("description"),
+                "original_counterparty": tx_data.get("counterparty"),
+                "is_edited": False,
+                "fingerprint": transaction_fingerprint(upload.account_id, key, ordinal),
+            }
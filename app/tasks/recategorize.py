@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Dict, Any
+from uuid import UUID
+
+from app.config import settings
+from app.tasks import celery_app
+from app.database import SessionLocal
+from app.models import RecategorizationJob
+from app.services.analytics_cache import analytics_cache
+from app.services.categorization import CategorizationService
+
+
+@celery_app.task(bind=True, max_retries=3, acks_late=True)
+def recategorize_task(self, job_id: str) -> Dict[str, Any]:
+    """
+    Recategorize all non-edited transactions of a user in the background.
+
+    Transactions are walked in id order in chunks of
+    RECATEGORIZE_CHUNK_SIZE. Each chunk is committed together with the
+    job checkpoint, so a retried or redelivered task resumes after the
+    last committed chunk and no chunk holds locks for long.
+    """
+    db = SessionLocal()
+    job_uuid = UUID(job_id)
+
+    try:
+        job = db.query(RecategorizationJob).filter(RecategorizationJob.id == job_uuid).first()
+        if not job:
+            return {"error": "Job not found"}
+        if job.status == "done":
+            return {"job_id": job_id, "status": "done", "updated": job.updated}
+
+        service = CategorizationService(db)
+
+        job.status = "running"
+        job.error_message = None
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+        if job.total is None:
+            job.total = service.count_recategorizable(job.user_id)
+        db.commit()
+
+        while True:
+            processed, updated, last_id = service.recategorize_chunk(
+                job.user_id,
+                after_id=job.last_transaction_id,
+                limit=settings.RECATEGORIZE_CHUNK_SIZE,
+            )
+            if not processed:
+                break
+
+            job.processed += processed
+            job.updated += updated
+            job.last_transaction_id = last_id
+            db.commit()
+            if updated:
+                analytics_cache.bump_user_version(job.user_id)
+
+        job.status = "done"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+        return {
+            "job_id": job_id,
+            "status": "done",
+            "processed": job.processed,
+            "updated": job.updated,
+        }
+
+    except Exception as e:
+        db.rollback()
+
+        retrying = self.request.retries < self.max_retries
+        job = db.query(RecategorizationJob).filter(RecategorizationJob.id == job_uuid).first()
+        if job:
+            # Stays "running" while retries are left, so no second job is
+            # started for the user meanwhile
+            job.status = "running" if retrying else "error"
+            job.error_message = str(e)
+            db.commit()
+
+        # Retry resumes from the last checkpoint
+        if retrying:
+            raise self.retry(exc=e, countdown=60 * (self.request.retries + 1))
+
+        return {
+            "job_id": job_id,
+            "status": "error",
+            "error": str(e),
+        }
+
+    finally:
+        db.close()
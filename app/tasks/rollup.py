@@ -0,0 +1,34 @@
+from typing import Any, Dict
+
+from app.tasks import celery_app
+from app.database import SessionLocal
+from app.services.rollup import RollupService
+
+BACKFILL_BATCH_SIZE = 100
+
+
+@celery_app.task
+def backfill_daily_aggregates_task() -> Dict[str, Any]:
+    """
+    Build daily_aggregates for accounts that predate the rollup.
+
+    One account per transaction; analytics switches each account from raw
+    rows to the rollup as soon as it is done. Safe to re-run. Start it
+    once after migrating, e.g.:
+        celery -A app.tasks call app.tasks.rollup.backfill_daily_aggregates_task
+    """
+    db = SessionLocal()
+    try:
+        service = RollupService(db)
+        accounts = 0
+        rows = 0
+        while True:
+            pending = service.pending_accounts(BACKFILL_BATCH_SIZE)
+            if not pending:
+                break
+            for account_id in pending:
+                rows += service.backfill_account(account_id)
+                accounts += 1
+        return {"accounts_backfilled": accounts, "rollup_rows": rows}
+    finally:
+        db.close()
@@ -0,0 +1,27 @@
+from typing import Any, Dict
+
+from app.tasks import celery_app
+from app.database import SessionLocal
+from app.services.upload import UploadService
+
+EXPIRE_BATCH_SIZE = 500
+
+
+@celery_app.task
+def expire_abandoned_uploads_task() -> Dict[str, Any]:
+    """
+    Delete direct uploads that were initiated but never completed, so
+    they do not stay in the uploads list. Scheduled by celery beat.
+    """
+    db = SessionLocal()
+    try:
+        service = UploadService(db)
+        deleted = 0
+        while True:
+            batch = service.expire_abandoned_uploads(EXPIRE_BATCH_SIZE)
+            if not batch:
+                break
+            deleted += batch
+        return {"uploads_deleted": deleted}
+    finally:
+        db.close()
@@ -0,0 +1,31 @@
+from typing import Any, Dict
+
+from app.tasks import celery_app
+from app.database import SessionLocal
+from app.services.upload import UploadService
+
+BACKFILL_BATCH_SIZE = 500
+
+
+@celery_app.task
+def backfill_upload_counts_task() -> Dict[str, Any]:
+    """
+    Store transaction_count for uploads imported before the column existed.
+
+    Runs in committed batches and is safe to re-run; until it finishes
+    the uploads list computes missing counts on the fly. Start it once
+    after migrating, e.g.:
+        celery -A app.tasks call app.tasks.upload_counts.backfill_upload_counts_task
+    """
+    db = SessionLocal()
+    try:
+        service = UploadService(db)
+        updated = 0
+        while True:
+            batch = service.backfill_transaction_counts(BACKFILL_BATCH_SIZE)
+            if not batch:
+                break
+            updated += batch
+        return {"uploads_updated": updated}
+    finally:
+        db.close()
@@ -4,8 +4,16 @@ from app.utils.security import (
     verify_token,
     get_password_hash,
     verify_password,
+    password_hasher,
+    PasswordHasherBusyError,
+)
+from app.utils.storage import (
+    StorageBackend,
+    MinIOStorage,
+    LocalStorage,
+    MemoryStorage,
+    get_storage,
 )
-from app.utils.storage import MinIOStorage
 
 __all__ = [
     "create_access_token",
@@ -13,5 +21,11 @@ __all__ = [
     "verify_token",
     "get_password_hash",
     "verify_password",
+    "password_hasher",
+    "PasswordHasherBusyError",
+    "StorageBackend",
     "MinIOStorage",
+    "LocalStorage",
+    "MemoryStorage",
+    "get_storage",
 ]
@@ -0,0 +1,23 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Tuple
+from uuid import UUID
+
+TransactionCursor = Tuple[date, datetime, UUID]
+
+
+def encode_cursor(tx_date: date, created_at: datetime, tx_id: UUID) -> str:
+    """Opaque cursor pointing just after a transaction in list order."""
+    raw = json.dumps([tx_date.isoformat(), created_at.isoformat(), str(tx_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> TransactionCursor:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tx_date, created_at, tx_id = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(tx_date), datetime.fromisoformat(created_at), UUID(tx_id)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, TypeVar
 from uuid import UUID
 
 from jose import jwt, JWTError
@@ -10,6 +13,12 @@ from app.schemas.common import TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing queue is full."""
+
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -19,6 +28,65 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasher:
+    """
+    Dedicated, bounded executor for bcrypt work.
+
+    bcrypt is deliberately slow CPU work; running it here keeps it off the
+    event loop and off the threadpool shared by sync endpoints. At most
+    `workers` hashes run at once and `max_queue` more may wait; beyond
+    that calls fail fast with PasswordHasherBusyError so a login burst is
+    shed instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusyError("Too many concurrent password checks")
+            self._in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hasher",
+                )
+
+            future = self._executor.submit(fn, *args)
+
+        # Count the job until the worker finishes it, even if the awaiting
+        # request is cancelled first
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": min(self._in_flight, self.workers),
+                "queued": max(self._in_flight - self.workers, 0),
+                "rejected": self.rejected,
+            }
+
+
 def create_access_token(user_id: UUID) -> str:
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {
@@ -55,3 +123,10 @@ def verify_token(token: str, token_type: str = "access") -> Optional[TokenPayloa
         )
     except JWTError:
         return None
+
+
+# Singleton instance
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -1,5 +1,16 @@
+import hashlib
 import io
-from typing import BinaryIO, Optional
+import json
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, NamedTuple, Optional, Tuple, Union
 from uuid import uuid4
 
 from minio import Minio
@@ -7,19 +18,179 @@ from minio.error import S3Error
 
 from app.config import settings
 
+COPY_CHUNK_SIZE = 1024 * 1024
 
-class MinIOStorage:
+
+class UploadTooLargeError(ValueError):
+    """Raised while streaming once an upload exceeds its size limit."""
+
+
+class ObjectNotFoundError(Exception):
+    """Raised when a requested object does not exist in storage."""
+
+
+class StoredObject(NamedTuple):
+    object_name: str
+    size: int
+    content_hash: str  # sha256 hex
+
+
+class ObjectInfo(NamedTuple):
+    size: int
+    content_type: Optional[str]
+
+
+class HashingReader:
+    """
+    Read-only file wrapper that hashes and counts bytes as they pass
+    through, failing as soon as more than `max_size` bytes were read.
+    """
+
+    def __init__(self, raw: BinaryIO, max_size: Optional[int] = None):
+        self._raw = raw
+        self._max_size = max_size
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._raw.read(size)
+        self.size += len(chunk)
+        if self._max_size is not None and self.size > self._max_size:
+            raise UploadTooLargeError(
+                f"File too large. Maximum size is {self._max_size // (1024 * 1024)}MB"
+            )
+        self._digest.update(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def sha256_file(path: Union[str, os.PathLike]) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StorageBackend(ABC):
+    """
+    Object storage used for uploaded statements and the parse cache.
+    Object names are bucket-relative paths such as "user_id/uuid_filename".
+    """
+
+    def ensure_bucket(self) -> None:
+        """Create the bucket/root if needed. Called once at startup."""
+
+    @abstractmethod
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        user_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ) -> StoredObject:
+        """Store a stream of unknown length, hashing it on the way."""
+
+    @abstractmethod
+    def put_bytes(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """Store bytes under a fixed object name, replacing any existing object."""
+
+    @abstractmethod
+    def download_file(self, object_name: str) -> bytes:
+        """Return object content; raises ObjectNotFoundError if missing."""
+
+    def download_to_file(self, object_name: str, out: BinaryIO) -> int:
+        """Write object content to a file object. Returns bytes written."""
+        data = self.download_file(object_name)
+        out.write(data)
+        return len(data)
+
+    @contextmanager
+    def download_to_temp(self, object_name: str) -> Iterator[Path]:
+        """
+        Stream an object into a temporary file and yield its path, so
+        parsers can open it from disk instead of holding it in memory.
+        The file is removed on exit.
+        """
+        fd, tmp_name = tempfile.mkstemp(prefix="pfm-", suffix=Path(object_name).suffix)
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                self.download_to_file(object_name, out)
+            yield tmp_path
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @abstractmethod
+    def stat_file(self, object_name: str) -> Optional[ObjectInfo]:
+        """Size and content type of an object, or None if missing."""
+
+    @abstractmethod
+    def delete_file(self, object_name: str) -> bool:
+        """Delete an object. Returns True if successful."""
+
+    def upload_file(
+        self,
+        file: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        user_id: Optional[str] = None,
+    ) -> str:
+        """
+        Upload a file to storage.
+        Returns the object path in the bucket.
+        """
+        return self.upload_stream(file, filename, content_type, user_id).object_name
+
+    def get_file_url(self, object_name: str, expires_hours: int = 1) -> str:
+        """Generate a presigned URL for file download."""
+        raise NotImplementedError(f"{type(self).__name__} does not support presigned URLs")
+
+    def get_upload_url(self, object_name: str, expires_minutes: int = 15) -> str:
+        """Generate a presigned URL for uploading a file with a single PUT."""
+        raise NotImplementedError(f"{type(self).__name__} does not support presigned URLs")
+
+    def new_object_name(self, filename: str, user_id: Optional[str] = None) -> str:
+        """Generate unique path: user_id/uuid_filename."""
+        unique_id = uuid4().hex[:8]
+        if user_id:
+            return f"{user_id}/{unique_id}_{filename}"
+        return f"uploads/{unique_id}_{filename}"
+
+
+class MinIOStorage(StorageBackend):
     def __init__(self):
+        # No network I/O here; the bucket is checked in ensure_bucket()
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
             secure=settings.MINIO_SECURE,
         )
+        # Presigned URLs are handed to clients outside the deployment,
+        # so they are signed for the endpoint those clients use
+        if settings.MINIO_PUBLIC_ENDPOINT:
+            self.public_client = Minio(
+                settings.MINIO_PUBLIC_ENDPOINT,
+                access_key=settings.MINIO_ACCESS_KEY,
+                secret_key=settings.MINIO_SECRET_KEY,
+                secure=settings.MINIO_PUBLIC_SECURE,
+                region=settings.MINIO_REGION,
+            )
+        else:
+            self.public_client = self.client
         self.bucket = settings.MINIO_BUCKET
-        self._ensure_bucket()
 
-    def _ensure_bucket(self) -> None:
+    def ensure_bucket(self) -> None:
         try:
             if not self.client.bucket_exists(self.bucket):
                 self.client.make_bucket(self.bucket)
@@ -37,12 +208,7 @@ class MinIOStorage:
         Upload a file to MinIO storage.
         Returns the object path in the bucket.
         """
-        # Generate unique path: user_id/uuid_filename
-        unique_id = uuid4().hex[:8]
-        if user_id:
-            object_name = f"{user_id}/{unique_id}_{filename}"
-        else:
-            object_name = f"uploads/{unique_id}_{filename}"
+        object_name = self.new_object_name(filename, user_id)
 
         # Get file size
         file.seek(0, 2)  # Seek to end
@@ -59,18 +225,103 @@ class MinIOStorage:
 
         return object_name
 
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        user_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ) -> StoredObject:
+        """
+        Upload a stream of unknown length to MinIO as a multipart upload.
+        Memory use is bounded by the part size; the content is hashed and
+        the size limit enforced on the fly (UploadTooLargeError aborts the
+        multipart upload).
+        """
+        object_name = self.new_object_name(filename, user_id)
+        reader = HashingReader(stream, max_size)
+
+        self.client.put_object(
+            self.bucket,
+            object_name,
+            reader,
+            length=-1,
+            part_size=settings.UPLOAD_PART_SIZE,
+            content_type=content_type,
+            num_parallel_uploads=1,
+        )
+
+        return StoredObject(object_name, reader.size, reader.hexdigest())
+
+    def put_bytes(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """
+        Store bytes under a fixed object name, replacing any existing object.
+        Returns the object path in the bucket.
+        """
+        self.client.put_object(
+            self.bucket,
+            object_name,
+            io.BytesIO(data),
+            len(data),
+            content_type=content_type,
+        )
+        return object_name
+
     def download_file(self, object_name: str) -> bytes:
         """
         Download a file from MinIO storage.
         Returns the file content as bytes.
         """
+        response = self._get_object(object_name)
         try:
-            response = self.client.get_object(self.bucket, object_name)
             return response.read()
         finally:
             response.close()
             response.release_conn()
 
+    def download_to_file(self, object_name: str, out: BinaryIO) -> int:
+        """
+        Stream a file from MinIO storage into a file object, one chunk
+        at a time. Returns bytes written.
+        """
+        response = self._get_object(object_name)
+        written = 0
+        try:
+            for chunk in response.stream(COPY_CHUNK_SIZE):
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+        return written
+
+    def _get_object(self, object_name: str):
+        try:
+            return self.client.get_object(self.bucket, object_name)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                raise ObjectNotFoundError(object_name) from e
+            raise
+
+    def stat_file(self, object_name: str) -> Optional[ObjectInfo]:
+        """
+        Get size and content type of a stored object.
+        Returns None if the object does not exist.
+        """
+        try:
+            stat = self.client.stat_object(self.bucket, object_name)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise
+        return ObjectInfo(stat.size, stat.content_type)
+
     def delete_file(self, object_name: str) -> bool:
         """
         Delete a file from MinIO storage.
@@ -86,13 +337,213 @@ class MinIOStorage:
         """
         Generate a presigned URL for file download.
         """
-        from datetime import timedelta
-        return self.client.presigned_get_object(
+        return self.public_client.presigned_get_object(
             self.bucket,
             object_name,
             expires=timedelta(hours=expires_hours),
         )
 
+    def get_upload_url(self, object_name: str, expires_minutes: int = 15) -> str:
+        """
+        Generate a presigned URL for uploading a file with a single PUT.
+        """
+        return self.public_client.presigned_put_object(
+            self.bucket,
+            object_name,
+            expires=timedelta(minutes=expires_minutes),
+        )
+
+
+class LocalStorage(StorageBackend):
+    """
+    Objects as files under a root directory, for single-node deployments.
+    Content types are kept in a ".meta" JSON file next to each object.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def ensure_bucket(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        user_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ) -> StoredObject:
+        object_name = self.new_object_name(filename, user_id)
+        path = self._path(object_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        reader = HashingReader(stream, max_size)
+
+        # Write to a temp file first so readers never see a partial object
+        tmp_path = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+        try:
+            with open(tmp_path, "wb") as out:
+                shutil.copyfileobj(reader, out, COPY_CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._write_meta(path, content_type)
+        return StoredObject(object_name, reader.size, reader.hexdigest())
+
+    def put_bytes(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        path = self._path(object_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._write_meta(path, content_type)
+        return object_name
+
+    def download_file(self, object_name: str) -> bytes:
+        try:
+            return self._path(object_name).read_bytes()
+        except FileNotFoundError as e:
+            raise ObjectNotFoundError(object_name) from e
+
+    @contextmanager
+    def download_to_temp(self, object_name: str) -> Iterator[Path]:
+        """Objects already are files; yield the stored path without copying."""
+        path = self._path(object_name)
+        if not path.is_file():
+            raise ObjectNotFoundError(object_name)
+        yield path
+
+    def stat_file(self, object_name: str) -> Optional[ObjectInfo]:
+        path = self._path(object_name)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return None
+        try:
+            content_type = json.loads(self._meta_path(path).read_text())["content_type"]
+        except (OSError, ValueError, KeyError):
+            content_type = mimetypes.guess_type(path.name)[0]
+        return ObjectInfo(size, content_type)
+
+    def delete_file(self, object_name: str) -> bool:
+        path = self._path(object_name)
+        try:
+            path.unlink()
+        except OSError:
+            return False
+        self._meta_path(path).unlink(missing_ok=True)
+        return True
+
+    def _path(self, object_name: str) -> Path:
+        # Object names embed user-supplied filenames; keep them under root
+        path = (self.root / object_name).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"Invalid object name: {object_name}")
+        return path
+
+    def _meta_path(self, path: Path) -> Path:
+        return path.with_name(f"{path.name}.meta")
+
+    def _write_meta(self, path: Path, content_type: str) -> None:
+        self._meta_path(path).write_text(json.dumps({"content_type": content_type}))
+
+
+class MemoryStorage(StorageBackend):
+    """Process-local storage for tests."""
+
+    def __init__(self):
+        self._objects: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        content_type: str = "application/octet-stream",
+        user_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ) -> StoredObject:
+        object_name = self.new_object_name(filename, user_id)
+        reader = HashingReader(stream, max_size)
+        buffer = io.BytesIO()
+        shutil.copyfileobj(reader, buffer, COPY_CHUNK_SIZE)
+        self.put_bytes(object_name, buffer.getvalue(), content_type)
+        return StoredObject(object_name, reader.size, reader.hexdigest())
+
+    def put_bytes(
+        self,
+        object_name: str,
+        data: bytes,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        with self._lock:
+            self._objects[object_name] = (bytes(data), content_type)
+        return object_name
+
+    def download_file(self, object_name: str) -> bytes:
+        with self._lock:
+            if object_name not in self._objects:
+                raise ObjectNotFoundError(object_name)
+            return self._objects[object_name][0]
+
+    def stat_file(self, object_name: str) -> Optional[ObjectInfo]:
+        with self._lock:
+            if object_name not in self._objects:
+                return None
+            data, content_type = self._objects[object_name]
+            return ObjectInfo(len(data), content_type)
+
+    def delete_file(self, object_name: str) -> bool:
+        with self._lock:
+            return self._objects.pop(object_name, None) is not None
+
+
+STORAGE_BACKENDS = {
+    "minio": MinIOStorage,
+    "local": lambda: LocalStorage(settings.LOCAL_STORAGE_PATH),
+    "memory": MemoryStorage,
+}
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    """Get the configured storage backend (created on first use, no I/O)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                backend = STORAGE_BACKENDS.get(settings.STORAGE_BACKEND)
+                if backend is None:
+                    raise RuntimeError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+                _storage = backend()
+    return _storage
+
+
+def set_storage(backend: Optional[StorageBackend]) -> None:
+    """Replace the storage backend (e.g. with MemoryStorage in tests)."""
+    global _storage
+    _storage = backend
+
+
+def init_storage() -> None:
+    """Check/create the bucket once; called on API and worker startup."""
+    get_storage().ensure_bucket()
+
+
+class _StorageProxy:
+    """Module-level handle that resolves the backend lazily on each use."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_storage(), name)
+
 
-# Singleton instance
-storage = MinIOStorage()
+# Lazy singleton
+storage: StorageBackend = _StorageProxy()  # type: ignore[assignment]
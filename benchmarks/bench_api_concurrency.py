@@ -0,0 +1,197 @@
+"""
+Benchmark a read route served sync (threadpool) vs async (asyncpg).
+
+Seeds a throwaway user with transactions, starts uvicorn in a subprocess
+with the API plus a copy of the previous sync transactions list mounted
+at /bench/sync/transactions, then drives both it and the async
+/api/v1/transactions with the same number of concurrent clients and
+reports requests/sec and latency. The user is deleted afterwards.
+
+Usage (app settings must be importable, e.g. from a configured .env):
+    python -m benchmarks.bench_api_concurrency [--clients 200] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy.orm import Session, joinedload
+
+SYNC_PATH = "/bench/sync/transactions"
+
+
+def build_app() -> FastAPI:
+    """The API app plus the legacy sync list route (uvicorn factory)."""
+    from app.api.deps import get_db, get_current_principal, Principal
+    from app.main import app
+    from app.models import Account, Transaction
+    from app.schemas import TransactionResponse
+
+    @app.get(SYNC_PATH, response_model=List[TransactionResponse])
+    def get_transactions_sync(
+        current_user: Principal = Depends(get_current_principal),
+        db: Session = Depends(get_db),
+        page: int = Query(1, ge=1),
+        size: int = Query(50, ge=1, le=100),
+    ):
+        return (
+            db.query(Transaction)
+            .join(Account)
+            .options(joinedload(Transaction.category))
+            .filter(Account.user_id == current_user.id)
+            .order_by(Transaction.date.desc(), Transaction.created_at.desc())
+            .offset((page - 1) * size)
+            .limit(size)
+            .all()
+        )
+
+    return app
+
+
+def seed(rows: int) -> tuple:
+    """Create a user with one account and `rows` transactions."""
+    from app.database import SessionLocal
+    from app.models import Account, Bank, Transaction, User
+    from app.utils.security import create_access_token
+
+    rnd = random.Random(42)
+    with SessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="-", name="bench")
+        db.add(user)
+        db.flush()
+        account = Account(user_id=user.id, bank_id=db.query(Bank).first().id, name="bench", currency="KGS")
+        db.add(account)
+        db.flush()
+        start = date(2024, 1, 1)
+        db.execute(
+            Transaction.__table__.insert(),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "account_id": account.id,
+                    "amount": Decimal(rnd.randrange(100, 100_000)) / 100,
+                    "type": rnd.choice(["income", "expense"]),
+                    "date": start + timedelta(days=rnd.randrange(365)),
+                    "description": f"bench row {i}",
+                    "is_edited": False,
+                }
+                for i in range(rows)
+            ],
+        )
+        db.commit()
+        return user.id, create_access_token(user.id)
+
+
+def cleanup(user_id: uuid.UUID) -> None:
+    from app.database import SessionLocal
+    from app.models import User
+
+    with SessionLocal() as db:
+        db.delete(db.get(User, user_id))
+        db.commit()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn",
+            "benchmarks.bench_api_concurrency:build_app", "--factory",
+            "--port", str(port), "--log-level", "warning", "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def drive(url: str, token: str, clients: int, duration: float) -> dict:
+    """Hammer `url` from `clients` concurrent loops for `duration` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(limits=limits, headers=headers, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url, params={"size": 50})
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--clients", type=int, default=200)
+    arg_parser.add_argument("--duration", type=float, default=10.0)
+    arg_parser.add_argument("--rows", type=int, default=5_000)
+    args = arg_parser.parse_args()
+
+    user_id, token = seed(args.rows)
+    port = free_port()
+    server = start_server(port)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        for label, path in (("sync", SYNC_PATH), ("async", "/api/v1/transactions")):
+            # Warm up pools and caches before measuring
+            asyncio.run(drive(base + path, token, args.clients, 1.0))
+            result = asyncio.run(drive(base + path, token, args.clients, args.duration))
+            print(
+                f"{label:6} {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50']:7.1f} ms  p99 {result['p99']:7.1f} ms  "
+                f"({result['requests']} ok, {result['errors']} errors)"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+        cleanup(user_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark the Bakai Excel parser: row-wise (iterrows) vs column-wise.
+
+Builds a synthetic statement sheet, reads it back through pandas the same
+way the parser does, then times the legacy per-row loop against
+BakaiBankParser._parse_excel_frame and checks both produce the same rows.
+
+Usage (app settings must be importable, e.g. from a configured .env):
+    python -m benchmarks.bench_bakai_excel [--rows 50000]
+"""
+import argparse
+import io
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+
+from app.parsers.bakai import BakaiBankParser
+
+DESCRIPTIONS = [
+    "Оплата: Магазин Globus {n}",
+    "Перевод от Иванов И.И. на карту",
+    "Покупка в KFC за обед",
+    "Снятие наличных ATM {n}",
+    "Пополнение от Asel K. на счет",
+    "Coffee House {n}",
+    "",
+]
+
+
+def build_sheet(rows: int, seed: int = 42) -> bytes:
+    """Build an .xlsx statement with separate income/expense columns."""
+    rnd = random.Random(seed)
+    start = date(2024, 1, 1)
+    data = {"Дата": [], "Описание": [], "Приход": [], "Расход": []}
+
+    for i in range(rows):
+        day = start + timedelta(days=rnd.randrange(365))
+        # Mix real dates with text dates as exported by the bank
+        data["Дата"].append(day.strftime("%d.%m.%Y") if i % 3 else day)
+        data["Описание"].append(rnd.choice(DESCRIPTIONS).format(n=rnd.randrange(1000)))
+
+        amount = f"{rnd.randrange(1, 500_000):,}.{rnd.randrange(100):02d}".replace(",", " ")
+        if rnd.random() < 0.3:
+            data["Приход"].append(amount)
+            data["Расход"].append(None)
+        else:
+            data["Приход"].append(None)
+            data["Расход"].append(amount.replace(".", ","))
+
+    buffer = io.BytesIO()
+    pd.DataFrame(data).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def parse_rowwise(parser: BakaiBankParser, df: pd.DataFrame) -> list:
+    """The previous iterrows implementation, kept for comparison."""
+    date_col = parser._find_df_column(df, ["дата", "date", "дата операции"])
+    desc_col = parser._find_df_column(df, ["описание", "description", "назначение", "детали"])
+    amount_col = parser._find_df_column(df, ["сумма", "amount"])
+    income_col = parser._find_df_column(df, ["приход", "credit", "зачисление", "дебет"])
+    expense_col = parser._find_df_column(df, ["расход", "debit", "списание", "кредит"])
+
+    def parse_date(val):
+        if val is None or pd.isna(val):
+            return None
+        if isinstance(val, datetime):
+            return val.date()
+        if isinstance(val, date):
+            return val
+        return parser._parse_date_str(str(val))
+
+    def parse_amount(val):
+        if val is None or pd.isna(val):
+            return None
+        if isinstance(val, (int, float)):
+            return Decimal(str(val))
+        val_str = str(val).strip()
+        if not val_str or val_str == "-":
+            return None
+        return parser.parse_amount(val_str)
+
+    transactions = []
+    for _, row in df.iterrows():
+        try:
+            tx_date = parse_date(row.get(date_col))
+            if not tx_date:
+                continue
+
+            if income_col and expense_col:
+                income_val = parse_amount(row.get(income_col))
+                expense_val = parse_amount(row.get(expense_col))
+                if income_val and income_val > 0:
+                    amount, tx_type = income_val, "income"
+                elif expense_val and expense_val > 0:
+                    amount, tx_type = expense_val, "expense"
+                else:
+                    continue
+            elif amount_col:
+                amount = parse_amount(row.get(amount_col))
+                if not amount:
+                    continue
+                tx_type = "income" if amount > 0 else "expense"
+                amount = abs(amount)
+            else:
+                continue
+
+            description = str(row.get(desc_col, "")).strip() or None
+            counterparty = parser._extract_counterparty(description)
+        except Exception:
+            continue
+
+        transactions.append({
+            "amount": amount,
+            "type": tx_type,
+            "date": tx_date,
+            "description": description,
+            "counterparty": counterparty,
+        })
+    return transactions
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=50_000)
+    args = arg_parser.parse_args()
+
+    parser = BakaiBankParser()
+
+    content, build_seconds = timed(build_sheet, args.rows)
+    df, read_seconds = timed(pd.read_excel, io.BytesIO(content))
+    df.columns = [str(col).lower().strip() for col in df.columns]
+
+    rowwise, rowwise_seconds = timed(parse_rowwise, parser, df)
+    columnar, columnar_seconds = timed(
+        lambda frame: list(parser._parse_excel_frame(frame)), df
+    )
+
+    print(f"rows:              {args.rows}")
+    print(f"build sheet:       {build_seconds:.2f}s")
+    print(f"read_excel:        {read_seconds:.2f}s")
+    print(f"iterrows:          {rowwise_seconds:.3f}s ({len(rowwise) / rowwise_seconds:,.0f} rows/sec)")
+    print(f"column-wise:       {columnar_seconds:.3f}s ({len(columnar) / columnar_seconds:,.0f} rows/sec)")
+    print(f"speed-up:          {rowwise_seconds / columnar_seconds:.1f}x")
+    print(f"identical output:  {rowwise == columnar}")
+
+
+if __name__ == "__main__":
+    main()
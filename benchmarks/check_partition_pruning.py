@@ -0,0 +1,118 @@
+"""
+Check that analytics queries only touch the transactions partitions of
+the requested range.
+
+Runs every AnalyticsService report for a date range, captures the SQL it
+sends, and EXPLAINs each statement. Lists the transactions partitions
+each plan scans and exits non-zero if one falls outside the range (the
+default partition counts as inside while a month of the range has no
+partition of its own).
+Nothing is written; the user id only has to be well-formed.
+
+Usage (app settings must be importable, e.g. from a configured .env):
+    python -m benchmarks.check_partition_pruning [--date-from 2024-03-01] [--date-to 2024-03-31]
+"""
+import argparse
+import json
+import sys
+import uuid
+from datetime import date
+from typing import Iterator, List, Set, Tuple
+
+from sqlalchemy import event
+
+PARTITION_PREFIX = "transactions_"
+DEFAULT_PARTITION = "transactions_default"
+
+
+def expected_partitions(date_from: date, date_to: date) -> Set[str]:
+    """Names of the monthly partitions overlapping [date_from, date_to]."""
+    names = set()
+    year, month = date_from.year, date_from.month
+    while (year, month) <= (date_to.year, date_to.month):
+        names.add(f"{PARTITION_PREFIX}y{year:04d}m{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return names
+
+
+def scanned_relations(plan: dict) -> Iterator[str]:
+    if "Relation Name" in plan:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from scanned_relations(child)
+
+
+def capture_statements(date_from: date, date_to: date) -> List[Tuple[str, str, dict]]:
+    """(report, SQL, params) of every statement the analytics reports run."""
+    from app.database import SessionLocal, engine
+    from app.services import AnalyticsService
+
+    user_id = uuid.uuid4()
+    reports = {
+        "summary": lambda s: s.get_summary(user_id, date_from, date_to),
+        "by-category": lambda s: s.get_by_category(user_id, date_from, date_to),
+        "by-period": lambda s: s.get_by_period(user_id, date_from, date_to, "day"),
+        "by-account": lambda s: s.get_by_account(user_id, date_from, date_to),
+        "dashboard": lambda s: s.get_dashboard(user_id, date_from, date_to),
+    }
+
+    captured = []
+    current = [""]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((current[0], statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            for name, report in reports.items():
+                current[0] = name
+                report(AnalyticsService(db))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return captured
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--date-from", type=date.fromisoformat, default=date(2024, 3, 1))
+    arg_parser.add_argument("--date-to", type=date.fromisoformat, default=date(2024, 3, 31))
+    args = arg_parser.parse_args()
+
+    from app.database import engine
+
+    expected = expected_partitions(args.date_from, args.date_to)
+    failed = False
+
+    with engine.connect() as conn:
+        existing = set(conn.exec_driver_sql(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'transactions'::regclass"
+        ).scalars())
+        # Months without a partition of their own live in the default one
+        if expected - existing:
+            expected.add(DEFAULT_PARTITION)
+
+        for report, statement, parameters in capture_statements(args.date_from, args.date_to):
+            # psycopg2 inlines the parameters, so pruning happens at plan time
+            plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scanned = {
+                name for name in scanned_relations(plan[0]["Plan"])
+                if name.startswith(PARTITION_PREFIX)
+            }
+            unexpected = scanned - expected
+            failed = failed or bool(unexpected)
+            print(
+                f"{'FAIL' if unexpected else 'ok':4}  {report:12} "
+                f"scans {', '.join(sorted(scanned)) or '(no transactions partitions)'}"
+            )
+            if unexpected:
+                print(f"      outside {args.date_from}..{args.date_to}: {', '.join(sorted(unexpected))}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()